@@ -13,13 +13,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from html_analysis_agent import HTMLAnalysisAgent
-from pathlib import Path
-
-
-def load_html_file(file_path):
-    """加载HTML文件"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
+from html_analysis_agent.utils import Utils
 
 
 def demo_advanced_search():
@@ -37,9 +31,10 @@ def demo_advanced_search():
         return
 
     # 加载HTML内容
-    html_content = load_html_file(test_file)
+    html_content = Utils.load_html_file(test_file)
+    original_size = len(html_content)
     print(f"加载文件: {test_file.name}")
-    print(f"   文件大小: {len(html_content):,} 字符")
+    print(f"   文件大小: {original_size:,} 字符")
 
     # 1. 关键词搜索
     print("\n1. 关键词搜索")
@@ -76,8 +71,9 @@ def demo_advanced_search():
         "//ul[@class='ul_1']"
     ]
 
+    xpath_results = agent.find_elements_by_xpath_batch(html_content, xpath_tests)
     for xpath in xpath_tests:
-        result = agent.find_elements_by_xpath(html_content, xpath)
+        result = xpath_results.get(xpath, {})
         found_count = result.get('total_found', 0)
         print(f"XPath: {xpath}")
         print(f"  找到元素: {found_count} 个")
@@ -100,8 +96,9 @@ def demo_advanced_search():
         ".ul_1"
     ]
 
+    css_results = agent.find_elements_by_css_batch(html_content, css_tests)
     for css in css_tests:
-        result = agent.find_elements_by_css(html_content, css)
+        result = css_results.get(css, {})
         found_count = result.get('total_found', 0)
         print(f"CSS: {css}")
         print(f"  找到元素: {found_count} 个")
@@ -134,7 +131,7 @@ def demo_advanced_search():
     print("\n\n5. 元素位置分析")
     print("-" * 30)
 
-    position_result = agent.analyze_element_positions(html_content)
+    position_result = agent.analyze_element_positions(html_content, hierarchy_only=True)
     hierarchy = position_result.get('position_analysis', {}).get('hierarchy_analysis', {})
 
     print(f"层级分析:")
@@ -150,14 +147,13 @@ def demo_advanced_search():
     print("\n\n6. HTML简化分析")
     print("-" * 30)
 
-    simplified_result = agent.analyze_html_with_simplification(html_content)
+    simplified_result = agent.analyze_html_with_simplification(html_content, include_details=False)
     stats = simplified_result.get('simplification_stats', {})
 
     print("简化统计:")
     for key, value in stats.items():
         print(f"  {key}: {value}")
 
-    original_size = len(html_content)
     simplified_size = len(simplified_result.get('simplified_html', ''))
     compression_ratio = (1 - simplified_size / original_size) * 100
 
@@ -194,26 +190,29 @@ def demo_multiple_files():
         print(f"\n处理: {product_name}")
 
         try:
-            html_content = load_html_file(file_path)
+            html_content = Utils.load_html_file(file_path)
 
             # 执行简化分析
-            simplified_result = agent.analyze_html_with_simplification(html_content)
+            simplified_result = agent.analyze_html_with_simplification(html_content, include_details=False)
             stats = simplified_result.get('simplification_stats', {})
 
             # 执行搜索
             search_result = agent.search_html_content(html_content, ['价格', '评分'])
 
+            file_size = len(html_content)
+            search_count = len(search_result.get('search_results', []))
+
             # 存储结果
             results[product_name] = {
-                'file_size': len(html_content),
+                'file_size': file_size,
                 'simplified_stats': stats,
-                'search_count': len(search_result.get('search_results', []))
+                'search_count': search_count
             }
 
-            print(f"   文件大小: {len(html_content):,} 字符")
+            print(f"   文件大小: {file_size:,} 字符")
             print(f"   移除脚本: {stats.get('script_tags', 0)} 个")
             print(f"   移除样式: {stats.get('style_tags', 0)} 个")
-            print(f"   搜索结果: {len(search_result.get('search_results', []))} 个")
+            print(f"   搜索结果: {search_count} 个")
 
         except Exception as e:
             print(f"  处理失败: {e}")
@@ -14,12 +14,7 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from html_analysis_agent import HTMLAnalysisAgent
-
-
-def load_html_file(file_path):
-    """加载HTML文件"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
+from html_analysis_agent.utils import Utils
 
 
 def demo_with_real_html():
@@ -32,6 +27,9 @@ def demo_with_real_html():
     agent = HTMLAnalysisAgent()
     print("   Agent初始化成功")
 
+    # 记录每个文件的简化结果，供后续演示复用
+    simplified_results = {}
+
     # 准备测试文件
     html_files = {
         '白沙香烟': '13_detail.html',
@@ -53,17 +51,21 @@ def demo_with_real_html():
 
         try:
             # 加载HTML内容
-            html_content = load_html_file(file_path)
-            print(f"   文件大小: {len(html_content):,} 字符")
+            html_content = Utils.load_html_file(file_path)
+            orig_len = len(html_content)
+            print(f"   文件大小: {orig_len:,} 字符")
 
             # 2. HTML简化分析
             print("\n2. HTML简化分析...")
-            simplified_result = agent.analyze_html_with_simplification(html_content)
+            simplified_result = agent.analyze_html_with_simplification(html_content, include_details=False)
             stats = simplified_result.get('simplification_stats', {})
+            simplified_html = simplified_result.get('simplified_html', '')
+            if 'error' not in simplified_result:
+                simplified_results[str(file_path)] = (simplified_html, stats)
             print(f"   简化统计:")
             for key, value in stats.items():
                 print(f"     {key}: {value}")
-            print(f"   简化后HTML长度: {len(simplified_result.get('simplified_html', '')):,} 字符")
+            print(f"   简化后HTML长度: {len(simplified_html):,} 字符")
 
             # 3. 数据容器分析
             print("\n3. 数据容器分析...")
@@ -141,7 +143,7 @@ def demo_with_real_html():
 
             # 7. 元素位置分析
             print("\n7. 元素位置分析...")
-            position_result = agent.analyze_element_positions(html_content)
+            position_result = agent.analyze_element_positions(html_content, hierarchy_only=True)
             hierarchy = position_result.get('position_analysis', {}).get('hierarchy_analysis', {})
             print(f"   元素层级分析:")
             print(f"     最大深度: {hierarchy.get('max_depth', 0)}")
@@ -166,38 +168,49 @@ def demo_with_real_html():
     print("   元素位置分析 - 层级结构理解")
     print("   结构化存储 - 高效数据管理")
 
+    return simplified_results
 
-def demo_html_simplification():
-    """演示HTML简化功能"""
-    print("\nHTML简化功能单独演示")
-    print("=" * 40)
 
-    from tools.html_simplifier import HTMLSimplifier
+def demo_html_simplification(simplified_results=None):
+    """演示HTML简化功能
 
-    simplifier = HTMLSimplifier()
+    Args:
+        simplified_results: demo_with_real_html返回的简化结果，已简化过的文件直接复用
+    """
+    print("\nHTML简化功能单独演示")
+    print("=" * 40)
 
     # 使用第一个HTML文件作为示例
     sample_file = Path('examples/13_detail.html')
     if sample_file.exists():
-        html_content = load_html_file(sample_file)
+        html_content = Utils.load_html_file(sample_file)
+        orig_len = len(html_content)
+
+        print(f"原始HTML长度: {orig_len:,} 字符")
 
-        print(f"原始HTML长度: {len(html_content):,} 字符")
+        # 简化HTML（已在前面的演示中简化过则直接复用）
+        cached = (simplified_results or {}).get(str(sample_file))
+        if cached is not None:
+            simplified, stats = cached
+        else:
+            from tools.html_simplifier import HTMLSimplifier
 
-        # 简化HTML
-        simplified = simplifier.simplify_html_string(html_content)
-        stats = simplifier.get_simplification_stats()
+            simplifier = HTMLSimplifier()
+            simplified = simplifier.simplify_html_string(html_content)
+            stats = simplifier.get_simplification_stats()
+        simplified_len = len(simplified)
 
-        print(f"简化后HTML长度: {len(simplified):,} 字符")
-        print(f"压缩比例: {(1 - len(simplified)/len(html_content)):.1%}")
+        print(f"简化后HTML长度: {simplified_len:,} 字符")
+        print(f"压缩比例: {(1 - simplified_len / orig_len):.1%}")
         print("\n简化统计:")
         for key, value in stats.items():
             print(f"  {key}: {value}")
 
         print("\n简化前后对比:")
         print("原始HTML片段:")
-        print(html_content[:200] + "..." if len(html_content) > 200 else html_content)
+        print(html_content[:200] + "..." if orig_len > 200 else html_content)
         print("\n简化HTML片段:")
-        print(simplified[:200] + "..." if len(simplified) > 200 else simplified)
+        print(simplified[:200] + "..." if simplified_len > 200 else simplified)
 
 
 def demo_content_search():
@@ -212,7 +225,7 @@ def demo_content_search():
     # 使用HTML文件进行搜索演示
     sample_file = Path('examples/13_detail.html')
     if sample_file.exists():
-        html_content = load_html_file(sample_file)
+        html_content = Utils.load_html_file(sample_file)
 
         # 构建搜索索引
         search_data = searcher.build_search_index(html_content)
@@ -236,10 +249,10 @@ def main():
     """主函数"""
     try:
         # 主要演示
-        demo_with_real_html()
+        simplified_results = demo_with_real_html()
 
         # 单独功能演示
-        demo_html_simplification()
+        demo_html_simplification(simplified_results)
         demo_content_search()
 
     except ImportError as e:
@@ -0,0 +1,35 @@
+"""
+数据容器分析的结构化输出模型
+
+LLM通过结构化输出直接返回符合该模型的JSON；仅在调用LLM时导入，避免启动时加载pydantic
+"""
+
+from typing import Dict, Any, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ContainerEntry(BaseModel):
+    """单个数据容器"""
+
+    tag: str
+    description: str = ''
+    content_preview: str = ''
+    attributes: Dict[str, Any] = Field(default_factory=dict)
+    importance: str = 'medium'
+    content_type: Optional[str] = None
+
+
+class ContainerAnalysis(BaseModel):
+    """按类别划分的数据容器分析结果"""
+
+    content_containers: List[ContainerEntry] = Field(default_factory=list)
+    navigation_menus: List[ContainerEntry] = Field(default_factory=list)
+    data_tables: List[ContainerEntry] = Field(default_factory=list)
+    form_elements: List[ContainerEntry] = Field(default_factory=list)
+    media_containers: List[ContainerEntry] = Field(default_factory=list)
+    interactive_elements: List[ContainerEntry] = Field(default_factory=list)
+    metadata_containers: List[ContainerEntry] = Field(default_factory=list)
+    list_structures: List[ContainerEntry] = Field(default_factory=list)
+    decorative_elements: List[ContainerEntry] = Field(default_factory=list)
+    other: List[ContainerEntry] = Field(default_factory=list)
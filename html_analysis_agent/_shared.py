@@ -0,0 +1,30 @@
+"""
+共享的工具实例
+
+解析器、分析器、定位器和变化检测器共用同一组简化器、搜索器和存储器，
+创建多个分析组件时不再重复构造
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def shared_simplifier():
+    """共享的HTML简化器"""
+    # 延迟导入以避免循环依赖
+    from tools.html_simplifier import HTMLSimplifier
+    return HTMLSimplifier()
+
+
+@lru_cache(maxsize=1)
+def shared_searcher():
+    """共享的内容搜索器"""
+    from tools.html_content_search import HTMLContentSearch
+    return HTMLContentSearch()
+
+
+@lru_cache(maxsize=1)
+def shared_data_store():
+    """共享的结构化数据存储器"""
+    from tools.structured_data_store import StructuredDataStore
+    return StructuredDataStore()
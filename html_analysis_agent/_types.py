@@ -0,0 +1,60 @@
+"""
+内部数据类型
+
+搜索结果在截断前以轻量对象保存，只引用索引项而不复制，仅对最终返回的结果生成字典
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+
+
+@dataclass(frozen=True)
+class ElementHit:
+    """关键词搜索命中的元素（引用共享的索引项）"""
+
+    # 手动声明__slots__（dataclass的slots参数需要Python 3.10+）
+    __slots__ = ('element', 'match_score', 'match_reasons', 'matched_keyword')
+
+    element: Dict[str, Any]
+    match_score: int
+    match_reasons: Tuple[str, ...]
+    matched_keyword: str
+
+    @property
+    def tag(self) -> str:
+        return self.element['tag']
+
+    @property
+    def path(self) -> str:
+        return self.element['path']
+
+    @property
+    def text_content(self) -> str:
+        return self.element['text_content']
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        return self.element['attributes']
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'match_score':
+            return self.match_score
+        if key == 'match_reasons':
+            return list(self.match_reasons)
+        return self.element[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """兼容字典的取值方式"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """生成与原搜索结果一致的字典（命中的关键字只在内部使用，不出现在结果中）"""
+        # 与_shared一致，工具模块在首次使用时才导入
+        from tools.html_content_search import copy_index_item
+        result = copy_index_item(self.element)
+        result['match_score'] = self.match_score
+        result['match_reasons'] = list(self.match_reasons)
+        return result
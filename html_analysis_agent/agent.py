@@ -5,10 +5,7 @@ HTML Analysis Agent - 主要的Agent类
 """
 
 from typing import Dict, List, Any, Optional
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
-from dotenv import load_dotenv
+from concurrent.futures import ProcessPoolExecutor
 import os
 
 from .html_parser import HTMLParser
@@ -16,9 +13,33 @@ from .data_analyzer import DataAnalyzer
 from .element_locator import ElementLocator
 from .change_detector import ChangeDetector
 from .selector_agent import SelectorAgent
+from .utils import Utils
 
-# 加载环境变量
-load_dotenv()
+# 批量分析工作进程内复用的组件（由 _init_batch_worker 在每个进程中创建一次）
+_batch_parser = None
+_batch_analyzer = None
+
+
+def _init_batch_worker():
+    """初始化批量分析工作进程，只创建解析和数据分析所需的组件"""
+    global _batch_parser, _batch_analyzer
+    _batch_parser = HTMLParser()
+    _batch_analyzer = DataAnalyzer()
+
+
+def _analyze_html_file(file_path: str) -> Dict[str, Any]:
+    """分析单个HTML文件（在工作进程中运行）"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+
+    return {
+        "file": file_path,
+        "file_size": len(html_content),
+        # 基础解析
+        "basic_analysis": _batch_parser.parse_html_elements(html_content),
+        # 数据容器分析
+        "data_analysis": _batch_analyzer.analyze_data_containers(html_content)
+    }
 
 
 class HTMLAnalysisAgent:
@@ -44,21 +65,16 @@ class HTMLAnalysisAgent:
             api_key: API密钥（可选，从环境变量读取）
             api_base: API基础URL（可选，从环境变量读取）
         """
-        # 配置LLM
-        api_key = api_key or os.getenv("OPENAI_API_KEY")
-        api_base = api_base or os.getenv("OPENAI_API_BASE")
-
-        if not api_key:
-            raise ValueError("API key is required. Set OPENAI_API_KEY in environment or pass api_key parameter.")
-
-        self.llm = ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            max_retries=max_retries,
-            api_key=api_key,
-            base_url=api_base
-        )
+        # LLM配置（LLM客户端和LangGraph Agent在首次使用时才创建，
+        # 只使用解析类工具时无需加载LangChain/LangGraph）
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self._api_key = api_key
+        self._api_base = api_base
+        self._llm = None
+        self.agent = None
 
         # 初始化工具类
         self.html_parser = HTMLParser()
@@ -74,11 +90,37 @@ class HTMLAnalysisAgent:
             api_base=api_base
         )
 
-        # 创建LangGraph Agent
-        self._setup_agent()
+    @property
+    def llm(self):
+        """LLM客户端（首次访问时创建）"""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            from dotenv import load_dotenv
+
+            # 加载环境变量
+            load_dotenv()
+
+            api_key = self._api_key or os.getenv("OPENAI_API_KEY")
+            api_base = self._api_base or os.getenv("OPENAI_API_BASE")
+
+            if not api_key:
+                raise ValueError("API key is required. Set OPENAI_API_KEY in environment or pass api_key parameter.")
+
+            self._llm = ChatOpenAI(
+                model=self.model_name,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                max_retries=self.max_retries,
+                api_key=api_key,
+                base_url=api_base
+            )
+        return self._llm
 
     def _setup_agent(self):
         """设置LangGraph Agent"""
+        from langgraph.prebuilt import create_react_agent
+        from langgraph.checkpoint.memory import InMemorySaver
+
         tools = [
             self.parse_html,
             self.analyze_data_containers,
@@ -134,30 +176,62 @@ class HTMLAnalysisAgent:
         """
         return self.html_parser.parse_html_elements(html_content, element_descriptions)
 
-    def analyze_data_containers(self, html_content: str) -> Dict[str, Any]:
+    def parse_html_batch(self, html_contents: List[str], element_descriptions: str = "",
+                         max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        批量解析多个HTML内容，在进程池中并行处理
+
+        Args:
+            html_contents: HTML内容列表
+            element_descriptions: 元素描述（可选，对所有文档相同）
+            max_workers: 最大工作进程数（默认为CPU核数）
+
+        Returns:
+            与输入顺序一致的解析结果列表
+        """
+        return self.html_parser.parse_html_elements_batch(html_contents, element_descriptions, max_workers)
+
+    def analyze_data_containers(self, html_content: str, persist: bool = True) -> Dict[str, Any]:
         """
         分析HTML中的数据容器
 
         Args:
             html_content: HTML内容
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
             数据容器分析结果字典
         """
-        return self.data_analyzer.analyze_data_containers(html_content)
+        return self.data_analyzer.analyze_data_containers(html_content, persist)
 
-    def analyze_element_positions(self, html_content: str, target_xpath: str = "") -> Dict[str, Any]:
+    def analyze_data_containers_batch(self, html_contents: List[str], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        批量分析多个HTML中的数据容器，LLM请求并发发出
+
+        Args:
+            html_contents: HTML内容列表
+            max_concurrency: 同时进行的LLM请求数上限
+
+        Returns:
+            与输入顺序一致的数据容器分析结果列表
+        """
+        return self.data_analyzer.analyze_data_containers_batch(html_contents, max_concurrency)
+
+    def analyze_element_positions(self, html_content: str, target_xpath: str = "",
+                                  hierarchy_only: bool = False, persist: bool = True) -> Dict[str, Any]:
         """
         分析元素位置关系
 
         Args:
             html_content: HTML内容
             target_xpath: 目标元素XPath（可选）
+            hierarchy_only: 只需要层级结构时设为True，跳过相似元素和分布分析
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
             位置分析结果字典
         """
-        return self.element_locator.analyze_element_positions(html_content, target_xpath)
+        return self.element_locator.analyze_element_positions(html_content, target_xpath, hierarchy_only, persist)
 
     def detect_changes(self, html_content: str, previous_html: str = "") -> Dict[str, Any]:
         """
@@ -212,6 +286,32 @@ class HTMLAnalysisAgent:
         """
         return self.element_locator.find_elements_by_css(html_content, css_selector)
 
+    def find_elements_by_xpath_batch(self, html_content: str, xpaths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        根据多个XPath批量查找元素，HTML只解析和遍历一次
+
+        Args:
+            html_content: HTML内容
+            xpaths: XPath表达式列表
+
+        Returns:
+            以XPath为键的查找结果字典
+        """
+        return self.element_locator.find_elements_by_xpath_batch(html_content, xpaths)
+
+    def find_elements_by_css_batch(self, html_content: str, css_selectors: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        根据多个CSS选择器批量查找元素，HTML只解析和遍历一次
+
+        Args:
+            html_content: HTML内容
+            css_selectors: CSS选择器列表
+
+        Returns:
+            以CSS选择器为键的查找结果字典
+        """
+        return self.element_locator.find_elements_by_css_batch(html_content, css_selectors)
+
     def analyze_with_agent(self, query: str, html_content: str = "", thread_id: str = "default") -> str:
         """
         使用LangGraph Agent进行分析
@@ -224,6 +324,9 @@ class HTMLAnalysisAgent:
         Returns:
             Agent响应
         """
+        if self.agent is None:
+            self._setup_agent()
+
         config = {"configurable": {"thread_id": thread_id}}
 
         # 如果提供了HTML内容，将其包含在查询中
@@ -241,72 +344,65 @@ class HTMLAnalysisAgent:
 
         return result["messages"][-1].content
 
-    def batch_analyze_html_files(self, file_paths: List[str], output_dir: str = "analysis_results"):
+    def batch_analyze_html_files(
+        self,
+        file_paths: List[str],
+        output_dir: str = "analysis_results",
+        max_workers: Optional[int] = None
+    ):
         """
         批量分析HTML文件
 
+        各文件相互独立，在进程池中并行处理。所有结果以JSON Lines格式
+        （每个文件一行）一次性写入 output_dir/batch_analysis.jsonl
+
         Args:
             file_paths: HTML文件路径列表
             output_dir: 输出目录
+            max_workers: 最大工作进程数（默认为CPU核数）
         """
-        import os
-
         # 创建输出目录
         os.makedirs(output_dir, exist_ok=True)
 
         results = []
+        if not file_paths:
+            return results
 
-        for file_path in file_paths:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    html_content = f.read()
-
-                # 基础解析
-                basic_result = self.parse_html(html_content)
-
-                # 数据容器分析
-                data_result = self.analyze_data_containers(html_content)
-
-                # 综合结果
-                result = {
-                    "file": file_path,
-                    "file_size": len(html_content),
-                    "basic_analysis": basic_result,
-                    "data_analysis": data_result
-                }
+        # 所有结果先写入缓冲区，最后一次写入文件
+        output_buffer = bytearray()
 
-                results.append(result)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_batch_worker) as executor:
+            futures = [executor.submit(_analyze_html_file, file_path) for file_path in file_paths]
 
-                # 保存单个文件结果
-                filename = os.path.basename(file_path).replace('.html', '_analysis.txt')
-                output_path = os.path.join(output_dir, filename)
+            # 按输入顺序收集结果，单个文件失败不影响其他文件
+            for file_path, future in zip(file_paths, futures):
+                try:
+                    result = future.result()
+                    output_buffer += Utils.dumps_json_bytes(result)
+                    output_buffer += b"\n"
+                    results.append(result)
 
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(f"文件: {file_path}\n")
-                    f.write(f"文件大小: {len(html_content):,} 字符\n")
-                    f.write("=" * 60 + "\n\n")
-                    f.write("基础解析结果:\n")
-                    f.write(basic_result)
-                    f.write("\n" + "=" * 60 + "\n\n")
-                    f.write("数据容器分析:\n")
-                    f.write(data_result)
+                except Exception as e:
+                    print(f"处理文件 {file_path} 时出错: {e}")
 
-            except Exception as e:
-                print(f"处理文件 {file_path} 时出错: {e}")
+        output_path = os.path.join(output_dir, "batch_analysis.jsonl")
+        with open(output_path, 'wb') as f:
+            f.write(output_buffer)
 
         return results
 
-    def analyze_html_with_simplification(self, html_content: str) -> Dict[str, Any]:
+    def analyze_html_with_simplification(self, html_content: str, include_details: bool = True) -> Dict[str, Any]:
         """
         使用HTML简化技术分析HTML内容
 
         Args:
             html_content: HTML内容
+            include_details: 是否包含结构树和内容映射（只需简化结果时可关闭）
 
         Returns:
             简化分析结果
         """
-        return self.selector_agent.analyze_html_with_simplification(html_content)
+        return self.selector_agent.analyze_html_with_simplification(html_content, include_details)
 
     def generate_selectors(self, html_content: str, element_description: str) -> Dict[str, Any]:
         """
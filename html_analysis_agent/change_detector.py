@@ -5,21 +5,52 @@
 """
 
 from typing import List, Dict, Any, Optional
-import difflib
+from collections import OrderedDict
+from itertools import islice
+
+from ._shared import shared_simplifier, shared_searcher, shared_data_store
+from .utils import Utils
 
 
 class ChangeDetector:
     """变化检测器"""
 
-    def __init__(self):
-        # 延迟导入以避免循环依赖
-        from tools.html_simplifier import HTMLSimplifier
-        from tools.html_content_search import HTMLContentSearch
-        from tools.structured_data_store import StructuredDataStore
+    # 缓存的行匹配器数量（按之前版本的简化HTML摘要索引）
+    MATCHER_CACHE_SIZE = 8
 
-        self.simplifier = HTMLSimplifier()
-        self.searcher = HTMLContentSearch()
-        self.data_store = StructuredDataStore()
+    # 替换区域任一侧超过该行数时不再逐行寻找相似行（细粒度比较的开销随两侧行数乘积增长）
+    FANCY_REPLACE_MAX_LINES = 500
+
+    def __init__(self):
+        # 简化器、搜索器和存储器在首次检测变化时才创建
+        self._simplifier = None
+        self._searcher = None
+        self._data_store = None
+
+        # 之前版本简化HTML的摘要 -> 已建立行索引的SequenceMatcher；
+        # 监控场景下基准版本保持不变，只需替换当前版本的行
+        self._matcher_cache = OrderedDict()
+
+    @property
+    def simplifier(self):
+        """HTML简化器（首次访问时创建）"""
+        if self._simplifier is None:
+            self._simplifier = shared_simplifier()
+        return self._simplifier
+
+    @property
+    def searcher(self):
+        """内容搜索器（首次访问时创建）"""
+        if self._searcher is None:
+            self._searcher = shared_searcher()
+        return self._searcher
+
+    @property
+    def data_store(self):
+        """结构化数据存储器（首次访问时创建）"""
+        if self._data_store is None:
+            self._data_store = shared_data_store()
+        return self._data_store
 
     def detect_changes(self, html_content: str, previous_html: str = "") -> Dict[str, Any]:
         """
@@ -36,21 +67,23 @@ class ChangeDetector:
             if not previous_html:
                 return {'error': '没有可比较的HTML内容，请先解析一个HTML文档'}
 
-            # 简化当前HTML
-            current_simplified = self.simplifier.simplify_html_string(html_content)
-            current_stats = self.simplifier.get_simplification_stats()
+            # 内容完全相同时只建一次索引，无需比较（轮询监控时的常见情况）
+            if html_content == previous_html:
+                return self._unchanged_result(html_content)
 
-            # 简化之前的HTML
-            previous_simplified = self.simplifier.simplify_html_string(previous_html)
-            previous_stats = self.simplifier.get_simplification_stats()
-
-            # 构建搜索索引
+            # 构建搜索索引（同时完成简化，每个版本只简化一次）
             current_search_data = self.searcher.build_search_index(html_content)
             previous_search_data = self.searcher.build_search_index(previous_html)
 
+            # 简化结果和统计直接取自搜索数据
+            current_simplified = current_search_data.get('simplified_html', '')
+            current_stats = dict(current_search_data.get('simplification_stats', {}))
+            previous_simplified = previous_search_data.get('simplified_html', '')
+            previous_stats = dict(previous_search_data.get('simplification_stats', {}))
+
             # 存储数据
-            current_doc_id = self.data_store.store_html_data(f"current_{hash(html_content) % 10000}", current_search_data)
-            previous_doc_id = self.data_store.store_html_data(f"previous_{hash(previous_html) % 10000}", previous_search_data)
+            current_doc_id = self.data_store.store_html_data(f"current_{Utils.content_digest(html_content)}", current_search_data)
+            previous_doc_id = self.data_store.store_html_data(f"previous_{Utils.content_digest(previous_html)}", previous_search_data)
 
             # 分析变化
             changes = self._analyze_changes(
@@ -71,6 +104,58 @@ class ChangeDetector:
         except Exception as e:
             return {'error': f"变化检测错误: {str(e)}"}
 
+    def _unchanged_result(self, html_content: str) -> Dict[str, Any]:
+        """
+        两个版本内容相同时的检测结果
+
+        与正常检测结果的字段一致（另加unchanged标记），两个版本共用同一份缓存的搜索数据
+
+        Args:
+            html_content: HTML内容（两个版本相同）
+
+        Returns:
+            变化检测结果字典
+        """
+        search_data = self.searcher.build_search_index(html_content)
+        simplified_html = search_data.get('simplified_html', '')
+        stats = search_data.get('simplification_stats', {})
+        element_count = len(search_data.get('search_index', {}))
+
+        # 存储数据（与正常检测相同的数据源ID）
+        digest = Utils.content_digest(html_content)
+        current_doc_id = self.data_store.store_html_data(f"current_{digest}", search_data)
+        previous_doc_id = self.data_store.store_html_data(f"previous_{digest}", search_data)
+
+        return {
+            'unchanged': True,
+            'current_doc_id': current_doc_id,
+            'previous_doc_id': previous_doc_id,
+            'current_simplified': simplified_html,
+            'previous_simplified': simplified_html,
+            'current_stats': dict(stats),
+            'previous_stats': dict(stats),
+            'changes': {
+                'simplification_changes': {},
+                'index_changes': {
+                    'added_elements': 0,
+                    'removed_elements': 0,
+                    'added_paths': [],
+                    'removed_paths': []
+                },
+                'text_differences': {
+                    'additions': 0,
+                    'deletions': 0,
+                    'changes': 0,
+                    'diff_summary': []
+                },
+                'summary': {
+                    'total_current_elements': element_count,
+                    'total_previous_elements': element_count,
+                    'elements_difference': 0
+                }
+            }
+        }
+
     def _analyze_changes(self, current_data: Dict[str, Any], previous_data: Dict[str, Any],
                         current_stats: Dict[str, Any], previous_stats: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -140,28 +225,61 @@ class ChangeDetector:
         return {
             'added_elements': len(added_paths),
             'removed_elements': len(removed_paths),
-            'added_paths': list(added_paths)[:10],  # 限制数量
-            'removed_paths': list(removed_paths)[:10]  # 限制数量
+            'added_paths': list(islice(added_paths, 10)),  # 限制数量
+            'removed_paths': list(islice(removed_paths, 10))  # 限制数量
         }
 
     def _analyze_text_differences(self, current_html: str, previous_html: str) -> Dict[str, Any]:
         """分析文本差异"""
-        # 计算文本差异
-        differ = difflib.Differ()
-        diff = list(differ.compare(previous_html.splitlines(), current_html.splitlines()))
+        import difflib
 
-        # 统计差异
-        additions = len([line for line in diff if line.startswith('+')])
-        deletions = len([line for line in diff if line.startswith('-')])
-        changes = len([line for line in diff if line.startswith('?')])
+        # 先按行定位变化区域；之前版本作为被索引的序列，重复比较同一基准时复用其索引和行列表
+        matcher = self._get_line_matcher(previous_html)
+        previous_lines = matcher.b
+        current_lines = current_html.splitlines()
+        matcher.set_seq1(current_lines)
 
-        # 生成差异摘要
+        additions = 0
+        deletions = 0
+        changes = 0
         diff_summary = []
-        for i, line in enumerate(diff):
-            if line.startswith(('+', '-', '?')):
-                diff_summary.append(line)
-                if len(diff_summary) >= 20:  # 限制摘要长度
-                    break
+
+        differ = difflib.Differ()
+        # 操作码中i对应当前版本的行，j对应之前版本的行
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+
+            if tag == 'delete':
+                # 纯新增/删除区域直接按行数计数，只为摘要生成需要的行
+                additions += i2 - i1
+                room = 20 - len(diff_summary)
+                diff_summary.extend('+ ' + line for line in current_lines[i1:min(i2, i1 + room)])
+            elif tag == 'insert':
+                deletions += j2 - j1
+                room = 20 - len(diff_summary)
+                diff_summary.extend('- ' + line for line in previous_lines[j1:min(j2, j1 + room)])
+            elif max(i2 - i1, j2 - j1) > self.FANCY_REPLACE_MAX_LINES:
+                # 超大替换区域按整块删除+新增处理，不做细粒度比较，也不生成行内'?'标记
+                deletions += j2 - j1
+                additions += i2 - i1
+                room = 20 - len(diff_summary)
+                diff_summary.extend('- ' + line for line in previous_lines[j1:min(j2, j1 + room)])
+                room = 20 - len(diff_summary)
+                diff_summary.extend('+ ' + line for line in current_lines[i1:min(i2, i1 + room)])
+            else:
+                # 只在替换区域内做细粒度比较
+                for line in differ.compare(previous_lines[j1:j2], current_lines[i1:i2]):
+                    if line.startswith('+'):
+                        additions += 1
+                    elif line.startswith('-'):
+                        deletions += 1
+                    elif line.startswith('?'):
+                        changes += 1
+                    else:
+                        continue
+                    if len(diff_summary) < 20:  # 限制摘要长度
+                        diff_summary.append(line)
 
         return {
             'additions': additions,
@@ -169,3 +287,27 @@ class ChangeDetector:
             'changes': changes,
             'diff_summary': diff_summary
         }
+
+    def _get_line_matcher(self, previous_html: str):
+        """获取以之前版本行为索引序列的匹配器，相同基准只拆分行和建立索引一次"""
+        try:
+            # C实现的SequenceMatcher（可选依赖），接口与difflib.SequenceMatcher一致
+            from cdifflib import CSequenceMatcher as SequenceMatcher
+        except ImportError:
+            from difflib import SequenceMatcher
+
+        cache_key = Utils.content_digest(previous_html)
+        matcher = self._matcher_cache.get(cache_key)
+        if matcher is not None:
+            self._matcher_cache.move_to_end(cache_key)
+            return matcher
+
+        # 关闭autojunk，避免HTML中大量重复行被当作噪声而产生超大的替换块
+        matcher = SequenceMatcher(None, autojunk=False)
+        matcher.set_seq2(previous_html.splitlines())
+
+        self._matcher_cache[cache_key] = matcher
+        if len(self._matcher_cache) > self.MATCHER_CACHE_SIZE:
+            self._matcher_cache.popitem(last=False)
+
+        return matcher
@@ -7,10 +7,38 @@ HTML Analysis Agent 命令行工具
 
 import argparse
 import sys
-import os
+from itertools import islice
 from .agent import HTMLAnalysisAgent
 from .utils import Utils
 
+# 数据容器类型的友好显示名称
+CONTAINER_DISPLAY_NAMES = {
+    'content_containers': '主要内容容器',
+    'navigation_menus': '导航菜单',
+    'data_tables': '数据表格',
+    'form_elements': '表单元素',
+    'media_containers': '媒体容器',
+    'interactive_elements': '交互元素',
+    'metadata_containers': '元数据容器',
+    'list_structures': '列表结构',
+    'decorative_elements': '装饰元素',
+    'other': '其他元素'
+}
+
+
+def _write_results(results, filename: str) -> bool:
+    """逐项把分析结果写入文件，各项之间用空行分隔"""
+    try:
+        with open(filename, 'w', encoding='utf-8') as f:
+            for index, (title, content) in enumerate(results):
+                if index:
+                    f.write("\n\n")
+                f.write(f"=== {title} ===\n{content}")
+        return True
+    except Exception as e:
+        print(f"保存文件错误: {e}")
+        return False
+
 
 def main():
     """主函数"""
@@ -52,17 +80,15 @@ def main():
 
     args = parser.parse_args()
 
-    # 检查输入文件
-    if not os.path.exists(args.input_file):
-        print(f"错误: 输入文件 '{args.input_file}' 不存在", file=sys.stderr)
-        sys.exit(1)
-
-    # 加载HTML内容
+    # 加载HTML内容（文件不存在时由读取本身报告，不再单独检查）
     try:
         html_content = Utils.load_html_file(args.input_file)
         print(f"成功加载HTML文件: {args.input_file} ({len(html_content):,} 字符)")
     except Exception as e:
-        print(f"错误: 无法加载HTML文件 - {e}", file=sys.stderr)
+        if isinstance(e.__cause__, FileNotFoundError):
+            print(f"错误: 输入文件 '{args.input_file}' 不存在", file=sys.stderr)
+        else:
+            print(f"错误: 无法加载HTML文件 - {e}", file=sys.stderr)
         sys.exit(1)
 
     # 验证HTML内容
@@ -103,20 +129,7 @@ def main():
             print("\n数据容器详情:")
             for container_type, items in containers.items():
                 if items and len(items) > 0:
-                    # 更友好的显示名称
-                    display_names = {
-                        'content_containers': '主要内容容器',
-                        'navigation_menus': '导航菜单',
-                        'data_tables': '数据表格',
-                        'form_elements': '表单元素',
-                        'media_containers': '媒体容器',
-                        'interactive_elements': '交互元素',
-                        'metadata_containers': '元数据容器',
-                        'list_structures': '列表结构',
-                        'decorative_elements': '装饰元素',
-                        'other': '其他元素'
-                    }
-                    friendly_name = display_names.get(container_type, container_type.upper())
+                    friendly_name = CONTAINER_DISPLAY_NAMES.get(container_type, container_type.upper())
 
                     print(f"\n{friendly_name} ({len(items)} 个):")
                     for i, item in enumerate(items[:3]):  # 每个类型最多显示3个
@@ -131,7 +144,7 @@ def main():
                             print(f"     内容预览: {content_preview[:80]}...")
                         attributes = item.get('attributes', {})
                         if attributes:
-                            attr_preview = ', '.join([f'{k}="{v}"' for k, v in list(attributes.items())[:2]])
+                            attr_preview = ', '.join([f'{k}="{v}"' for k, v in islice(attributes.items(), 2)])
                             print(f"     属性: {attr_preview}")
                         print()
 
@@ -150,14 +163,16 @@ def main():
     # 保存结果
     if args.output:
         try:
-            # 合并所有结果
-            combined_result = "\n\n".join([f"=== {title} ===\n{content}" for title, content in results])
-
-            # 格式化输出
-            formatted_result = Utils.format_output(combined_result, args.format)
+            if args.format == 'html':
+                # HTML格式需要包装完整内容
+                combined_result = "\n\n".join([f"=== {title} ===\n{content}" for title, content in results])
+                formatted_result = Utils.format_output(combined_result, args.format)
+                saved = Utils.save_results_to_file(formatted_result, args.output)
+            else:
+                # 文本和JSON格式的合并结果原样输出，逐项写入文件，不再拼接完整字符串
+                saved = _write_results(results, args.output)
 
-            # 保存到文件
-            if Utils.save_results_to_file(formatted_result, args.output):
+            if saved:
                 print(f"\n结果已保存到: {args.output}")
             else:
                 print(f"\n错误: 无法保存结果到 {args.output}", file=sys.stderr)
@@ -4,64 +4,273 @@
 基于HTML简化技术和结构化存储的数据容器分析
 """
 
-from typing import List, Dict, Any, Optional
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
-from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import os
-import json
+import re
+import sys
+
+from ._shared import shared_simplifier, shared_searcher, shared_data_store
+from .utils import Utils
+
+# 表格和列表结构分析使用的标签集合
+_HEADER_TAGS = frozenset({'th', 'thead'})
+_ROW_TAGS = frozenset({'tr', 'td', 'tbody'})
+_LIST_ITEM_TAGS = frozenset({'li', 'dt', 'dd'})
+
+
+# 后备分析考察的候选容器标签
+_FALLBACK_CANDIDATE_TAGS = ['div', 'section', 'article', 'nav', 'header', 'footer',
+                            'table', 'form', 'ul', 'ol', 'dl', 'button', 'a',
+                            'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p']
+
+# 后备分析的分类规则，按优先级排列：
+# (命中的标签, class文本正则, 属性文本正则, 分类, 描述, 重要性)，任一条件满足即归入该分类
+_FALLBACK_RULES = (
+    (frozenset({'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}), re.compile('title'), None,
+     'metadata_containers', '标题和元数据', 'high'),
+    (frozenset({'nav'}), re.compile('nav|menu'), None,
+     'navigation_menus', '导航菜单', 'medium'),
+    (frozenset({'table'}), None, None,
+     'data_tables', '数据表格', 'medium'),
+    (frozenset({'form'}), None, None,
+     'form_elements', '表单元素', 'high'),
+    (frozenset(), re.compile('image|video|media|gallery|photo'), None,
+     'media_containers', '媒体内容容器', 'medium'),
+    (frozenset({'button', 'a'}), None, re.compile('onclick|href'),
+     'interactive_elements', '交互式元素', 'medium'),
+    (frozenset({'ul', 'ol', 'dl'}), None, None,
+     'list_structures', '列表结构', 'medium'),
+    (frozenset(), re.compile('decoration|decorative|ornament|style'), None,
+     'decorative_elements', '装饰性元素', 'low'),
+    (frozenset(), re.compile('content|main|article|post|body'), None,
+     'content_containers', '主要内容容器', 'high'),
+)
+
+# 数据容器分析的系统提示（不含任何页面内容，所有请求共享同一前缀，便于模型服务端缓存）
+_CONTAINER_SYSTEM_PROMPT = """
+你是一个专业的HTML内容分析专家，请分析用户提供的HTML内容，识别并分类其中的各种数据容器和内容结构。
+
+请按以下格式返回JSON结果，分类应该基于内容的实际用途和结构特征：
+
+{
+    "content_containers": [
+        {
+            "tag": "div",
+            "description": "主要内容容器",
+            "content_preview": "主要内容文本预览...",
+            "attributes": {"class": "main-content", "id": "content"},
+            "importance": "high",
+            "content_type": "article|blog|product|news|etc"
+        }
+    ],
+    "navigation_menus": [
+        {
+            "tag": "nav",
+            "description": "导航菜单",
+            "content_preview": "菜单项预览...",
+            "attributes": {"class": "nav-menu"},
+            "importance": "medium"
+        }
+    ],
+    "data_tables": [
+        {
+            "tag": "table",
+            "description": "数据表格",
+            "content_preview": "表格数据预览...",
+            "attributes": {"class": "data-table"},
+            "importance": "medium"
+        }
+    ],
+    "form_elements": [
+        {
+            "tag": "form",
+            "description": "表单元素",
+            "content_preview": "表单内容预览...",
+            "attributes": {"id": "contact-form"},
+            "importance": "high"
+        }
+    ],
+    "media_containers": [
+        {
+            "tag": "div",
+            "description": "媒体内容容器",
+            "content_preview": "图片、视频等媒体内容...",
+            "attributes": {"class": "media-gallery"},
+            "importance": "medium"
+        }
+    ],
+    "interactive_elements": [
+        {
+            "tag": "button",
+            "description": "交互式元素",
+            "content_preview": "按钮、链接等交互元素...",
+            "attributes": {"onclick": "action()"},
+            "importance": "medium"
+        }
+    ],
+    "metadata_containers": [
+        {
+            "tag": "header",
+            "description": "元数据容器",
+            "content_preview": "标题、作者、时间等元数据...",
+            "attributes": {"class": "article-meta"},
+            "importance": "high"
+        }
+    ],
+    "list_structures": [
+        {
+            "tag": "ul",
+            "description": "列表结构",
+            "content_preview": "列表项内容...",
+            "attributes": {"class": "feature-list"},
+            "importance": "medium"
+        }
+    ],
+    "decorative_elements": [
+        {
+            "tag": "div",
+            "description": "装饰性元素",
+            "content_preview": "装饰内容...",
+            "attributes": {"class": "decoration"},
+            "importance": "low"
+        }
+    ],
+    "other": [
+        {
+            "tag": "span",
+            "description": "其他未分类元素",
+            "content_preview": "其他内容...",
+            "attributes": {},
+            "importance": "low"
+        }
+    ]
+}
+
+通用分析要求：
+1. 根据HTML元素的实际用途和内容特征进行智能分类
+2. 识别各种网页类型的通用结构（文章、博客、电商、新闻、论坛等）
+3. 评估内容的价值和重要性
+4. 提取有意义的内容预览和关键属性
+5. 避免将无用的装饰元素误认为重要数据容器
+6. 每个类别最多返回8个最重要的容器
+7. 分类应该灵活适应不同类型的网页
+
+分类标准：
+- content_containers: 主要内容区域
+- navigation_menus: 导航和菜单
+- data_tables: 表格数据
+- form_elements: 表单和输入
+- media_containers: 图片视频等媒体
+- interactive_elements: 按钮、链接等交互元素
+- metadata_containers: 标题、作者、时间等元信息
+- list_structures: 各种列表结构
+- decorative_elements: 纯装饰性元素
+- other: 未分类的其他元素
+"""
+
+
+# 发送给LLM的HTML最大字符数
+_LLM_HTML_LIMIT = 6000
+
+
+def _truncate_for_llm(html_content: str, limit: int = _LLM_HTML_LIMIT) -> str:
+    """截断发送给LLM的HTML，尽量在标签结束处截断以免发送半个标签；未超长时原样返回"""
+    if len(html_content) <= limit:
+        return html_content
+    cut = html_content.rfind('>', 0, limit)
+    return html_content[:cut + 1] if cut > 0 else html_content[:limit]
+
+
+def _is_trivial_html(html_content: str) -> bool:
+    """空白或不含任何标签的输入（如抓取失败返回的空响应）无需解析和分析"""
+    return not html_content or '<' not in html_content
 
-# 加载环境变量
-load_dotenv()
+
+@lru_cache(maxsize=1)
+def _shared_llm():
+    """数据容器分析使用的LLM客户端，进程内只创建一次"""
+    from langchain_openai import ChatOpenAI
+    from dotenv import load_dotenv
+
+    # 加载环境变量（只在首次创建客户端时读取一次）
+    load_dotenv()
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    api_base = os.getenv("OPENAI_API_BASE")
+    return ChatOpenAI(
+        model_name="gemini-2.5-flash",
+        temperature=0,
+        max_tokens=4000,
+        api_key=api_key,
+        base_url=api_base
+    )
 
 
 class DataAnalyzer:
     """数据容器分析器"""
 
+    # 表格和列表分析使用的关键词组
+    TABLE_KEYWORDS = ('table', 'thead', 'tbody', 'tr', 'th', 'td')
+    LIST_KEYWORDS = ('ul', 'ol', 'dl', 'li', 'dt', 'dd')
+
+    # 缓存的LLM容器分析结果数量（按发送给LLM的简化HTML摘要索引）
+    CONTAINER_CACHE_SIZE = 64
+
     def __init__(self):
-        # 延迟导入以避免循环依赖
-        from tools.html_simplifier import HTMLSimplifier
-        from tools.html_content_search import HTMLContentSearch
-        from tools.structured_data_store import StructuredDataStore
-
-        self.simplifier = HTMLSimplifier()
-        self.searcher = HTMLContentSearch()
-        self.data_store = StructuredDataStore()
-
-        # 初始化LLM
-        api_key = os.getenv("OPENAI_API_KEY")
-        api_base = os.getenv("OPENAI_API_BASE")
-        self.llm = ChatOpenAI(
-            model_name="gemini-2.5-flash",
-            temperature=0,
-            max_tokens=4000,
-            api_key=api_key,
-            base_url=api_base
-        )
-
-    def analyze_data_containers(self, html_content: str) -> Dict[str, Any]:
+        self.simplifier = shared_simplifier()
+        self.searcher = shared_searcher()
+        self.data_store = shared_data_store()
+
+        # LLM客户端在首次分析数据容器时才创建
+        self._llm = None
+        self._container_llm = None
+
+        # 简化HTML摘要 -> LLM容器分析结果；简化HTML只保留结构，
+        # 同一模板生成的不同页面（如分页列表）通常得到相同的简化HTML，可直接复用结果
+        self._container_cache = OrderedDict()
+
+    @property
+    def llm(self):
+        """LLM客户端（首次访问时获取，所有分析器共享同一客户端和连接池）"""
+        if self._llm is None:
+            self._llm = _shared_llm()
+        return self._llm
+
+    @property
+    def container_llm(self):
+        """以结构化输出返回ContainerAnalysis的LLM（首次访问时创建）"""
+        if self._container_llm is None:
+            from ._container_schema import ContainerAnalysis
+
+            # JSON模式保证返回合法JSON，再按ContainerAnalysis校验
+            self._container_llm = self.llm.with_structured_output(ContainerAnalysis, method="json_mode")
+        return self._container_llm
+
+    def analyze_data_containers(self, html_content: str, persist: bool = True) -> Dict[str, Any]:
         """
         使用LLM智能识别和分析HTML中的数据容器
 
         Args:
             html_content: HTML内容
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
             数据容器分析结果字典
         """
-        try:
-            # 构建搜索索引
-            search_data = self.searcher.build_search_index(html_content)
+        if _is_trivial_html(html_content):
+            return self._trivial_container_result(html_content)
 
-            # 存储数据
-            source_id = f"data_analysis_{hash(html_content) % 10000}"
-            doc_id = self.data_store.store_html_data(source_id, search_data)
+        try:
+            # 构建搜索索引并存储数据
+            doc_id, search_data = self._index_and_store(html_content, 'data_analysis', persist)
 
             # 简化HTML内容用于LLM分析
             simplified_html = search_data.get('simplified_html', '')
             if not simplified_html:
-                simplified_html = html_content[:8000]  # 限制长度
+                simplified_html = _truncate_for_llm(html_content)  # 限制长度
 
             # 使用LLM进行智能数据容器分析
             container_analysis = self._analyze_containers_with_llm(simplified_html)
@@ -70,36 +279,96 @@ class DataAnalyzer:
                 'doc_id': doc_id,
                 'containers': container_analysis,
                 'simplified_html': simplified_html,
-                'stats': search_data.get('simplification_stats', {})
+                'stats': dict(search_data.get('simplification_stats', {}))
             }
 
         except Exception as e:
             return {'error': f"数据容器分析错误: {str(e)}"}
 
-    def analyze_tables(self, html_content: str) -> Dict[str, Any]:
+    def analyze_data_containers_batch(self, html_contents: List[str], max_concurrency: int = 8,
+                                      persist: bool = True) -> List[Dict[str, Any]]:
+        """
+        批量分析多个HTML中的数据容器，LLM请求并发发出
+
+        Args:
+            html_contents: HTML内容列表
+            max_concurrency: 同时进行的LLM请求数上限
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
+
+        Returns:
+            与输入顺序一致的数据容器分析结果列表
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(html_contents)
+        pending = []  # (结果位置, 简化HTML, 截断后的HTML, 缓存键)
+
+        for position, html_content in enumerate(html_contents):
+            if _is_trivial_html(html_content):
+                results[position] = self._trivial_container_result(html_content)
+                continue
+            try:
+                doc_id, search_data = self._index_and_store(html_content, 'data_analysis', persist)
+                simplified_html = search_data.get('simplified_html', '') or _truncate_for_llm(html_content)
+                results[position] = {
+                    'doc_id': doc_id,
+                    'simplified_html': simplified_html,
+                    'stats': dict(search_data.get('simplification_stats', {}))
+                }
+                # 已缓存相同简化HTML的分析结果时不再请求LLM（截断一次，缓存键和提示共用）
+                truncated_html = _truncate_for_llm(simplified_html)
+                cache_key = Utils.content_digest(truncated_html)
+                cached = self._get_cached_containers(cache_key)
+                if cached is not None:
+                    results[position]['containers'] = cached
+                else:
+                    pending.append((position, simplified_html, truncated_html, cache_key))
+            except Exception as e:
+                results[position] = {'error': f"数据容器分析错误: {str(e)}"}
+
+        if pending:
+            try:
+                prompts = [self._build_container_prompt(truncated_html) for _, _, truncated_html, _ in pending]
+                responses = self.container_llm.batch(prompts, config={'max_concurrency': max_concurrency},
+                                                     return_exceptions=True)
+            except Exception as e:
+                responses = [e] * len(pending)
+
+            for (position, simplified_html, _, cache_key), response in zip(pending, responses):
+                if isinstance(response, Exception):
+                    print(f"LLM分析错误: {response}")
+                    containers = self._fallback_analysis(simplified_html)
+                else:
+                    containers = response.model_dump(exclude_none=True)
+                    self._cache_containers(cache_key, containers)
+                results[position]['containers'] = containers
+
+        return results
+
+    def analyze_tables(self, html_content: str, persist: bool = True) -> Dict[str, Any]:
         """
         分析HTML中的表格结构
 
         Args:
             html_content: HTML内容
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
             表格分析结果字典
         """
-        try:
-            # 构建搜索索引
-            search_data = self.searcher.build_search_index(html_content)
+        if _is_trivial_html(html_content):
+            return {
+                'doc_id': None,
+                'table_analysis': self._analyze_table_structure([]),
+                'table_elements': [],
+                'simplified_html': html_content or '',
+                'stats': {'trivial': True}
+            }
 
-            # 存储数据
-            source_id = f"table_analysis_{hash(html_content) % 10000}"
-            doc_id = self.data_store.store_html_data(source_id, search_data)
+        try:
+            # 构建搜索索引并存储数据
+            doc_id, search_data = self._index_and_store(html_content, 'table_analysis', persist)
 
             # 搜索表格相关元素
-            table_keywords = ['table', 'thead', 'tbody', 'tr', 'th', 'td']
-            table_results = []
-            for keyword in table_keywords:
-                results = self.searcher.search_by_keyword(keyword)
-                table_results.extend(results)
+            table_results = self._search_keyword_group(self.TABLE_KEYWORDS)
 
             # 分析表格结构
             table_analysis = self._analyze_table_structure(table_results)
@@ -109,36 +378,38 @@ class DataAnalyzer:
                 'table_analysis': table_analysis,
                 'table_elements': table_results[:20],
                 'simplified_html': search_data.get('simplified_html', ''),
-                'stats': search_data.get('simplification_stats', {})
+                'stats': dict(search_data.get('simplification_stats', {}))
             }
 
         except Exception as e:
             return {'error': f"表格分析错误: {str(e)}"}
 
-    def analyze_lists(self, html_content: str) -> Dict[str, Any]:
+    def analyze_lists(self, html_content: str, persist: bool = True) -> Dict[str, Any]:
         """
         分析HTML中的列表结构
 
         Args:
             html_content: HTML内容
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
             列表分析结果字典
         """
-        try:
-            # 构建搜索索引
-            search_data = self.searcher.build_search_index(html_content)
+        if _is_trivial_html(html_content):
+            return {
+                'doc_id': None,
+                'list_analysis': self._analyze_list_structure([]),
+                'list_elements': [],
+                'simplified_html': html_content or '',
+                'stats': {'trivial': True}
+            }
 
-            # 存储数据
-            source_id = f"list_analysis_{hash(html_content) % 10000}"
-            doc_id = self.data_store.store_html_data(source_id, search_data)
+        try:
+            # 构建搜索索引并存储数据
+            doc_id, search_data = self._index_and_store(html_content, 'list_analysis', persist)
 
             # 搜索列表相关元素
-            list_keywords = ['ul', 'ol', 'dl', 'li', 'dt', 'dd']
-            list_results = []
-            for keyword in list_keywords:
-                results = self.searcher.search_by_keyword(keyword)
-                list_results.extend(results)
+            list_results = self._search_keyword_group(self.LIST_KEYWORDS)
 
             # 分析列表结构
             list_analysis = self._analyze_list_structure(list_results)
@@ -148,181 +419,181 @@ class DataAnalyzer:
                 'list_analysis': list_analysis,
                 'list_elements': list_results[:20],
                 'simplified_html': search_data.get('simplified_html', ''),
-                'stats': search_data.get('simplification_stats', {})
+                'stats': dict(search_data.get('simplification_stats', {}))
             }
 
         except Exception as e:
             return {'error': f"列表分析错误: {str(e)}"}
 
-    def _analyze_containers_with_llm(self, html_content: str) -> Dict[str, List[Dict[str, Any]]]:
+    def _trivial_container_result(self, html_content: str) -> Dict[str, Any]:
+        """空白或不含任何标签的输入的数据容器分析结果"""
+        return {
+            'doc_id': None,
+            'containers': {},
+            'simplified_html': html_content or '',
+            'stats': {'trivial': True}
+        }
+
+    def analyze_all(self, html_content: str, persist: bool = True) -> Dict[str, Dict[str, Any]]:
         """
-        使用LLM智能分析HTML中的数据容器
+        对同一页面同时进行数据容器、表格和列表分析
+
+        共享的搜索器、简化器和存储器不是线程安全的，索引构建、存储以及表格和列表分析都在当前线程中进行；
+        只有耗时的LLM容器分析在后台线程中进行，与表格和列表分析重叠执行
 
         Args:
             html_content: HTML内容
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
-            分类后的数据容器字典
+            {'data_containers': ..., 'tables': ..., 'lists': ...}
         """
-        try:
-            # 构建通用分析提示
-            analysis_prompt = f"""
-你是一个专业的HTML内容分析专家，请分析以下HTML内容，识别并分类其中的各种数据容器和内容结构。
+        containers_result = None
+        if _is_trivial_html(html_content):
+            containers_result = self._trivial_container_result(html_content)
+        else:
+            try:
+                # 构建搜索索引并存储数据（与analyze_data_containers相同）
+                doc_id, search_data = self._index_and_store(html_content, 'data_analysis', persist)
+                simplified_html = search_data.get('simplified_html', '') or _truncate_for_llm(html_content)
+            except Exception as e:
+                containers_result = {'error': f"数据容器分析错误: {str(e)}"}
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            containers_future = None
+            if containers_result is None:
+                # 后台线程只调用LLM（及失败时的后备分析），不访问共享的工具实例
+                containers_future = executor.submit(self._analyze_containers_with_llm, simplified_html)
+
+            tables = self.analyze_tables(html_content, persist)
+            lists = self.analyze_lists(html_content, persist)
+
+            if containers_future is not None:
+                containers_result = {
+                    'doc_id': doc_id,
+                    'containers': containers_future.result(),
+                    'simplified_html': simplified_html,
+                    'stats': dict(search_data.get('simplification_stats', {}))
+                }
 
-HTML内容：
-{html_content[:6000]}  # 限制长度避免token超限
+        return {
+            'data_containers': containers_result,
+            'tables': tables,
+            'lists': lists
+        }
 
-请按以下格式返回JSON结果，分类应该基于内容的实际用途和结构特征：
+    def _index_and_store(self, html_content: str, source_prefix: str,
+                         persist: bool = True) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        构建搜索索引并存储数据
 
-{{
-    "content_containers": [
-        {{
-            "tag": "div",
-            "description": "主要内容容器",
-            "content_preview": "主要内容文本预览...",
-            "attributes": {{"class": "main-content", "id": "content"}},
-            "importance": "high",
-            "content_type": "article|blog|product|news|etc"
-        }}
-    ],
-    "navigation_menus": [
-        {{
-            "tag": "nav",
-            "description": "导航菜单",
-            "content_preview": "菜单项预览...",
-            "attributes": {{"class": "nav-menu"}},
-            "importance": "medium"
-        }}
-    ],
-    "data_tables": [
-        {{
-            "tag": "table",
-            "description": "数据表格",
-            "content_preview": "表格数据预览...",
-            "attributes": {{"class": "data-table"}},
-            "importance": "medium"
-        }}
-    ],
-    "form_elements": [
-        {{
-            "tag": "form",
-            "description": "表单元素",
-            "content_preview": "表单内容预览...",
-            "attributes": {{"id": "contact-form"}},
-            "importance": "high"
-        }}
-    ],
-    "media_containers": [
-        {{
-            "tag": "div",
-            "description": "媒体内容容器",
-            "content_preview": "图片、视频等媒体内容...",
-            "attributes": {{"class": "media-gallery"}},
-            "importance": "medium"
-        }}
-    ],
-    "interactive_elements": [
-        {{
-            "tag": "button",
-            "description": "交互式元素",
-            "content_preview": "按钮、链接等交互元素...",
-            "attributes": {{"onclick": "action()"}},
-            "importance": "medium"
-        }}
-    ],
-    "metadata_containers": [
-        {{
-            "tag": "header",
-            "description": "元数据容器",
-            "content_preview": "标题、作者、时间等元数据...",
-            "attributes": {{"class": "article-meta"}},
-            "importance": "high"
-        }}
-    ],
-    "list_structures": [
-        {{
-            "tag": "ul",
-            "description": "列表结构",
-            "content_preview": "列表项内容...",
-            "attributes": {{"class": "feature-list"}},
-            "importance": "medium"
-        }}
-    ],
-    "decorative_elements": [
-        {{
-            "tag": "div",
-            "description": "装饰性元素",
-            "content_preview": "装饰内容...",
-            "attributes": {{"class": "decoration"}},
-            "importance": "low"
-        }}
-    ],
-    "other": [
-        {{
-            "tag": "span",
-            "description": "其他未分类元素",
-            "content_preview": "其他内容...",
-            "attributes": {{}},
-            "importance": "low"
-        }}
-    ]
-}}
+        索引由搜索器按内容摘要缓存，数据源ID同样基于内容摘要，
+        同一页面被多个分析入口使用时只解析和存储一次
 
-通用分析要求：
-1. 根据HTML元素的实际用途和内容特征进行智能分类
-2. 识别各种网页类型的通用结构（文章、博客、电商、新闻、论坛等）
-3. 评估内容的价值和重要性
-4. 提取有意义的内容预览和关键属性
-5. 避免将无用的装饰元素误认为重要数据容器
-6. 每个类别最多返回8个最重要的容器
-7. 分类应该灵活适应不同类型的网页
+        Args:
+            html_content: HTML内容
+            source_prefix: 数据源ID前缀
+            persist: 是否存储数据
 
-分类标准：
-- content_containers: 主要内容区域
-- navigation_menus: 导航和菜单
-- data_tables: 表格数据
-- form_elements: 表单和输入
-- media_containers: 图片视频等媒体
-- interactive_elements: 按钮、链接等交互元素
-- metadata_containers: 标题、作者、时间等元信息
-- list_structures: 各种列表结构
-- decorative_elements: 纯装饰性元素
-- other: 未分类的其他元素
-"""
+        Returns:
+            (文档ID（不存储时为None）, 搜索数据)
+        """
+        search_data = self.searcher.build_search_index(html_content)
+        if not persist:
+            return None, search_data
 
-            # 调用LLM进行分析
-            response = self.llm.invoke(analysis_prompt)
-            response_text = response.content.strip()
+        source_id = f"{source_prefix}_{Utils.content_digest(html_content)}"
+        doc_id = self.data_store.store_html_data(source_id, search_data)
+        return doc_id, search_data
 
-            # 解析JSON响应
-            try:
-                # 尝试提取JSON部分
-                if '```json' in response_text:
-                    json_start = response_text.find('```json') + 7
-                    json_end = response_text.rfind('```')
-                    json_content = response_text[json_start:json_end].strip()
-                elif '```' in response_text:
-                    json_start = response_text.find('```') + 3
-                    json_end = response_text.rfind('```')
-                    json_content = response_text[json_start:json_end].strip()
-                else:
-                    json_content = response_text
+    def _search_keyword_group(self, keywords) -> List[Dict[str, Any]]:
+        """
+        一次遍历索引搜索一组关键词
+
+        结果按关键词顺序排列，同一元素被多个关键词命中时只保留第一次命中的结果
+
+        Args:
+            keywords: 关键词列表
+
+        Returns:
+            去重后的搜索结果列表
+        """
+        from tools.html_content_search import copy_index_item
+
+        results = []
+        seen_ids = set()
+
+        for item, match_score, match_reasons, keyword in self.searcher.find_keyword_matches(list(keywords)):
+            element_id = item['element_id']
+            if element_id in seen_ids:
+                continue
+            seen_ids.add(element_id)
 
-                # 清理JSON字符串
-                json_content = json_content.replace('```json', '').replace('```', '').strip()
+            result_item = copy_index_item(item)
+            result_item['match_score'] = match_score
+            result_item['match_reasons'] = list(match_reasons)
+            results.append(result_item)
 
-                result = json.loads(json_content)
-                return result
+        return results
 
-            except json.JSONDecodeError as e:
-                print(f"JSON解析错误: {e}")
-                print(f"原始响应: {response_text}")
-                return self._fallback_analysis(html_content)
+    def _analyze_containers_with_llm(self, html_content: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        使用LLM智能分析HTML中的数据容器
+
+        Args:
+            html_content: HTML内容
+
+        Returns:
+            分类后的数据容器字典
+        """
+        # 截断一次，缓存键和发送给LLM的提示共用截断结果
+        truncated_html = _truncate_for_llm(html_content)
+        cache_key = Utils.content_digest(truncated_html)
+        cached = self._get_cached_containers(cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            # 调用LLM进行分析
+            analysis = self.container_llm.invoke(self._build_container_prompt(truncated_html))
+            containers = analysis.model_dump(exclude_none=True)
+            self._cache_containers(cache_key, containers)
+            return containers
 
         except Exception as e:
             print(f"LLM分析错误: {e}")
             return self._fallback_analysis(html_content)
 
+    def _get_cached_containers(self, cache_key: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """取出缓存的LLM容器分析结果"""
+        cached = self._container_cache.get(cache_key)
+        if cached is not None:
+            self._container_cache.move_to_end(cache_key)
+        return cached
+
+    def _cache_containers(self, cache_key: str, containers: Dict[str, List[Dict[str, Any]]]):
+        """缓存LLM容器分析结果（后备分析的结果不缓存）"""
+        self._container_cache[cache_key] = containers
+        if len(self._container_cache) > self.CONTAINER_CACHE_SIZE:
+            self._container_cache.popitem(last=False)
+
+    def _build_container_prompt(self, truncated_html: str) -> list:
+        """
+        构建数据容器分析消息：固定的系统提示在前，页面HTML单独作为用户消息
+
+        Args:
+            truncated_html: 已由_truncate_for_llm截断的HTML（限制长度避免token超限）
+
+        Returns:
+            消息列表
+        """
+        from langchain_core.messages import SystemMessage, HumanMessage
+
+        return [
+            SystemMessage(content=_CONTAINER_SYSTEM_PROMPT),
+            HumanMessage(content=f"HTML内容：\n{truncated_html}")
+        ]
+
     def _fallback_analysis(self, html_content: str) -> Dict[str, List[Dict[str, Any]]]:
         """
         后备分析方法 - 当LLM分析失败时使用简化的通用HTML分析
@@ -347,110 +618,42 @@ HTML内容：
         }
 
         # 简化的后备逻辑
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        from bs4 import BeautifulSoup, SoupStrainer
 
-        # 查找各种可能的容器元素
-        candidates = soup.find_all(['div', 'section', 'article', 'nav', 'header', 'footer',
-                                  'table', 'form', 'ul', 'ol', 'dl', 'button', 'a',
-                                  'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p'])
+        # 使用lxml解析，并只保留候选容器元素（及其子树），其余标签在解析时直接跳过
+        soup = BeautifulSoup(html_content, 'lxml', parse_only=SoupStrainer(_FALLBACK_CANDIDATE_TAGS))
 
-        for element in candidates[:30]:  # 限制数量
-            tag_name = element.name
+        # 查找各种可能的容器元素（嵌套的候选元素仍按文档顺序返回）
+        candidates = soup.find_all(_FALLBACK_CANDIDATE_TAGS, limit=30)  # 限制数量
+
+        for element in candidates:
+            tag_name = sys.intern(element.name)
             attrs = dict(element.attrs) if element.attrs else {}
-            text_content = element.get_text()[:200].strip()
+            # 只取预览所需的文本前缀，外层容器不再拼接整页文本
+            text_content = Utils.text_prefix(element, 200).strip()
             class_attr = attrs.get('class', [])
             id_attr = attrs.get('id', '')
 
-            # 通用分类逻辑
-            if tag_name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6'] or any('title' in str(c).lower() for c in class_attr):
-                container_types['metadata_containers'].append({
-                    'tag': tag_name,
-                    'description': '标题和元数据',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'high'
-                })
-            elif tag_name == 'nav' or any(nav in str(class_attr).lower() for nav in ['nav', 'menu', 'navigation']):
-                container_types['navigation_menus'].append({
-                    'tag': tag_name,
-                    'description': '导航菜单',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'medium'
-                })
-            elif tag_name == 'table':
-                container_types['data_tables'].append({
-                    'tag': tag_name,
-                    'description': '数据表格',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'medium'
-                })
-            elif tag_name == 'form':
-                container_types['form_elements'].append({
-                    'tag': tag_name,
-                    'description': '表单元素',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'high'
-                })
-            elif any(media in str(class_attr).lower() for media in ['image', 'video', 'media', 'gallery', 'photo']):
-                container_types['media_containers'].append({
-                    'tag': tag_name,
-                    'description': '媒体内容容器',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'medium'
-                })
-            elif tag_name in ['button', 'a'] or any(click in str(attrs).lower() for click in ['onclick', 'href']):
-                container_types['interactive_elements'].append({
-                    'tag': tag_name,
-                    'description': '交互式元素',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'medium'
-                })
-            elif tag_name in ['ul', 'ol', 'dl']:
-                container_types['list_structures'].append({
-                    'tag': tag_name,
-                    'description': '列表结构',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'medium'
-                })
-            elif any(dec in str(class_attr).lower() for dec in ['decoration', 'decorative', 'ornament', 'style']):
-                container_types['decorative_elements'].append({
-                    'tag': tag_name,
-                    'description': '装饰性元素',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'low'
-                })
-            elif any(content in str(class_attr).lower() for content in ['content', 'main', 'article', 'post', 'body']):
-                container_types['content_containers'].append({
-                    'tag': tag_name,
-                    'description': '主要内容容器',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'high'
-                })
-            elif len(text_content) > 10:  # 有实质内容的容器
-                container_types['content_containers'].append({
-                    'tag': tag_name,
-                    'description': '通用内容容器',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'medium'
-                })
+            # 通用分类逻辑：按优先级依次匹配规则表（class文本只转换一次）
+            class_text = str(class_attr).lower()
+            for tags, class_pattern, attrs_pattern, category, description, importance in _FALLBACK_RULES:
+                if (tag_name in tags
+                        or (class_pattern is not None and class_pattern.search(class_text))
+                        or (attrs_pattern is not None and attrs_pattern.search(str(attrs).lower()))):
+                    break
             else:
-                container_types['other'].append({
-                    'tag': tag_name,
-                    'description': '其他元素',
-                    'content_preview': text_content,
-                    'attributes': attrs,
-                    'importance': 'low'
-                })
+                if len(text_content) > 10:  # 有实质内容的容器
+                    category, description, importance = 'content_containers', '通用内容容器', 'medium'
+                else:
+                    category, description, importance = 'other', '其他元素', 'low'
+
+            container_types[category].append({
+                'tag': tag_name,
+                'description': description,
+                'content_preview': text_content,
+                'attributes': attrs,
+                'importance': importance
+            })
 
         return container_types
 
@@ -460,14 +663,15 @@ HTML内容：
         headers = []
         rows = []
 
+        # 标签 -> 所属分组，每个元素只做一次字典查找
+        buckets = {'table': tables}
+        buckets.update(dict.fromkeys(_HEADER_TAGS, headers))
+        buckets.update(dict.fromkeys(_ROW_TAGS, rows))
+
         for result in table_results:
-            tag = result.get('tag', '').lower()
-            if tag == 'table':
-                tables.append(result)
-            elif tag in ['th', 'thead']:
-                headers.append(result)
-            elif tag in ['tr', 'td', 'tbody']:
-                rows.append(result)
+            bucket = buckets.get(result.get('tag', '').lower())
+            if bucket is not None:
+                bucket.append(result)
 
         return {
             'total_tables': len(tables),
@@ -483,16 +687,13 @@ HTML内容：
         definition_lists = []
         list_items = []
 
+        buckets = {'ul': unordered_lists, 'ol': ordered_lists, 'dl': definition_lists}
+        buckets.update(dict.fromkeys(_LIST_ITEM_TAGS, list_items))
+
         for result in list_results:
-            tag = result.get('tag', '').lower()
-            if tag == 'ul':
-                unordered_lists.append(result)
-            elif tag == 'ol':
-                ordered_lists.append(result)
-            elif tag == 'dl':
-                definition_lists.append(result)
-            elif tag in ['li', 'dt', 'dd']:
-                list_items.append(result)
+            bucket = buckets.get(result.get('tag', '').lower())
+            if bucket is not None:
+                bucket.append(result)
 
         return {
             'unordered_lists': unordered_lists[:5],
@@ -500,22 +701,3 @@ HTML内容：
             'definition_lists': definition_lists[:5],
             'list_items': list_items[:20]
         }
-
-    def _matches_keywords(self, text: str, keywords: List[str]) -> bool:
-        """检查文本是否匹配关键词"""
-        text_lower = text.lower()
-        return any(keyword.lower() in text_lower for keyword in keywords)
-
-    def _matches_attributes(self, attributes: Dict[str, Any], keywords: List[str]) -> bool:
-        """检查属性是否匹配关键词"""
-        for attr_name, attr_value in attributes.items():
-            attr_name_lower = attr_name.lower()
-            if isinstance(attr_value, list):
-                attr_value_str = ' '.join(str(v).lower() for v in attr_value)
-            else:
-                attr_value_str = str(attr_value).lower()
-
-            if any(keyword.lower() in attr_name_lower or keyword.lower() in attr_value_str
-                   for keyword in keywords):
-                return True
-        return False
@@ -5,28 +5,37 @@
 """
 
 from typing import List, Dict, Any, Optional
+from collections import Counter, OrderedDict
+from itertools import chain
+
+from ._shared import shared_simplifier, shared_searcher, shared_data_store
+from .utils import Utils
 
 
 class ElementLocator:
     """元素定位"""
 
+    # 选择器查找结果缓存容量
+    SELECTOR_CACHE_SIZE = 64
+
     def __init__(self):
-        # 延迟导入以避免循环依赖
-        from tools.html_simplifier import HTMLSimplifier
-        from tools.html_content_search import HTMLContentSearch
-        from tools.structured_data_store import StructuredDataStore
+        self.simplifier = shared_simplifier()
+        self.searcher = shared_searcher()
+        self.data_store = shared_data_store()
 
-        self.simplifier = HTMLSimplifier()
-        self.searcher = HTMLContentSearch()
-        self.data_store = StructuredDataStore()
+        # (内容摘要, 选择器类型, 选择器) -> 查找结果（元组，取出时复制为列表）
+        self._selector_cache = OrderedDict()
 
-    def analyze_element_positions(self, html_content: str, target_xpath: str = "") -> Dict[str, Any]:
+    def analyze_element_positions(self, html_content: str, target_xpath: str = "",
+                                  hierarchy_only: bool = False, persist: bool = True) -> Dict[str, Any]:
         """
         分析元素位置关系
 
         Args:
             html_content: HTML内容
             target_xpath: 目标元素XPath（可选）
+            hierarchy_only: 只需要层级结构时设为True，跳过相似元素和分布分析
+            persist: 是否存储到结构化数据存储（为False时不存储，doc_id为None）
 
         Returns:
             位置分析结果字典
@@ -36,17 +45,19 @@ class ElementLocator:
             search_data = self.searcher.build_search_index(html_content)
 
             # 存储数据
-            source_id = f"position_analysis_{hash(html_content) % 10000}"
-            doc_id = self.data_store.store_html_data(source_id, search_data)
+            doc_id = None
+            if persist:
+                source_id = f"position_analysis_{Utils.content_digest(html_content)}"
+                doc_id = self.data_store.store_html_data(source_id, search_data)
 
             # 分析元素位置
-            position_analysis = self._analyze_positions(search_data, target_xpath)
+            position_analysis = self._analyze_positions(search_data, target_xpath, hierarchy_only)
 
             return {
                 'doc_id': doc_id,
                 'position_analysis': position_analysis,
                 'simplified_html': search_data.get('simplified_html', ''),
-                'stats': search_data.get('simplification_stats', {})
+                'stats': dict(search_data.get('simplification_stats', {}))
             }
 
         except Exception as e:
@@ -64,11 +75,7 @@ class ElementLocator:
             查找结果字典
         """
         try:
-            # 构建搜索索引
-            search_data = self.searcher.build_search_index(html_content)
-
-            # 使用搜索器查找匹配的元素
-            search_results = self.searcher.search_by_selector(xpath, 'xpath')
+            search_results = self._find_elements(html_content, xpath, 'xpath')
 
             return {
                 'found_elements': search_results,
@@ -91,11 +98,7 @@ class ElementLocator:
             查找结果字典
         """
         try:
-            # 构建搜索索引
-            search_data = self.searcher.build_search_index(html_content)
-
-            # 使用搜索器查找匹配的元素
-            search_results = self.searcher.search_by_selector(css_selector, 'css')
+            search_results = self._find_elements(html_content, css_selector, 'css')
 
             return {
                 'found_elements': search_results,
@@ -106,26 +109,146 @@ class ElementLocator:
         except Exception as e:
             return {'error': f"CSS选择器查找错误: {str(e)}"}
 
-    def _analyze_positions(self, search_data: Dict[str, Any], target_xpath: str = "") -> Dict[str, Any]:
+    def find_elements_by_xpath_batch(self, html_content: str, xpaths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        根据多个XPath批量查找元素
+
+        Args:
+            html_content: HTML内容
+            xpaths: XPath表达式列表
+
+        Returns:
+            以XPath为键的查找结果字典
+        """
+        try:
+            batch_results = self._find_elements_batch(html_content, xpaths, 'xpath')
+
+            return {
+                xpath: {
+                    'found_elements': search_results,
+                    'xpath': xpath,
+                    'total_found': len(search_results)
+                }
+                for xpath, search_results in batch_results.items()
+            }
+
+        except Exception as e:
+            return {'error': f"XPath批量查找错误: {str(e)}"}
+
+    def find_elements_by_css_batch(self, html_content: str, css_selectors: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        根据多个CSS选择器批量查找元素
+
+        Args:
+            html_content: HTML内容
+            css_selectors: CSS选择器列表
+
+        Returns:
+            以CSS选择器为键的查找结果字典
+        """
+        try:
+            batch_results = self._find_elements_batch(html_content, css_selectors, 'css')
+
+            return {
+                css_selector: {
+                    'found_elements': search_results,
+                    'css_selector': css_selector,
+                    'total_found': len(search_results)
+                }
+                for css_selector, search_results in batch_results.items()
+            }
+
+        except Exception as e:
+            return {'error': f"CSS选择器批量查找错误: {str(e)}"}
+
+    def _find_elements_batch(self, html_content: str, selectors: List[str],
+                             selector_type: str) -> Dict[str, List[Dict[str, Any]]]:
+        """批量查找匹配选择器的元素，未命中缓存的选择器在一次索引遍历中匹配（返回缓存结果的副本）"""
+        from tools.html_content_search import copy_index_item
+
+        digest = Utils.content_digest(html_content)
+        results = {}
+        pending = []
+
+        for selector in selectors:
+            if selector in results:
+                continue
+            cache_key = (digest, selector_type, selector)
+            cached = self._selector_cache.get(cache_key)
+            if cached is not None:
+                self._selector_cache.move_to_end(cache_key)
+                results[selector] = list(map(copy_index_item, cached))
+            else:
+                results[selector] = None
+                pending.append(selector)
+
+        if pending:
+            # 只需要索引，跳过HTML简化
+            self.searcher.build_search_index(html_content, simplify=False)
+            matched = self.searcher.search_by_selectors(pending, selector_type)
+
+            for selector in pending:
+                # 搜索器返回的已是副本，缓存保留这一份，调用方拿到另一份副本
+                self._selector_cache[(digest, selector_type, selector)] = tuple(matched[selector])
+                results[selector] = list(map(copy_index_item, matched[selector]))
+            while len(self._selector_cache) > self.SELECTOR_CACHE_SIZE:
+                self._selector_cache.popitem(last=False)
+
+        return results
+
+    def _find_elements(self, html_content: str, selector: str, selector_type: str) -> List[Dict[str, Any]]:
+        """
+        查找匹配选择器的元素，相同的(HTML, 选择器)组合直接复用结果
+
+        缓存中保存不可变的元组，每次返回新的列表和元素副本，调用方修改结果不会影响之后的查找
+        """
+        from tools.html_content_search import copy_index_item
+
+        cache_key = (Utils.content_digest(html_content), selector_type, selector)
+        cached = self._selector_cache.get(cache_key)
+        if cached is not None:
+            self._selector_cache.move_to_end(cache_key)
+            return list(map(copy_index_item, cached))
+
+        # 只需要索引，跳过HTML简化
+        self.searcher.build_search_index(html_content, simplify=False)
+
+        # 使用搜索器查找匹配的元素
+        search_results = self.searcher.search_by_selector(selector, selector_type)
+
+        self._selector_cache[cache_key] = tuple(search_results)
+        if len(self._selector_cache) > self.SELECTOR_CACHE_SIZE:
+            self._selector_cache.popitem(last=False)
+
+        return list(map(copy_index_item, search_results))
+
+    def _analyze_positions(self, search_data: Dict[str, Any], target_xpath: str = "",
+                           hierarchy_only: bool = False) -> Dict[str, Any]:
         """
         分析元素位置关系
 
         Args:
             search_data: 搜索数据
             target_xpath: 目标XPath
+            hierarchy_only: 是否只分析层级结构
 
         Returns:
             位置分析结果
         """
         search_index = search_data.get('search_index', {})
 
+        # 将索引一次性转换为按列存储的节点表，后续分析只读取需要的列
+        node_table = self._build_node_table(search_index)
+
         # 分析层级结构
-        hierarchy_analysis = self._analyze_hierarchy(search_index)
+        hierarchy_analysis = self._analyze_hierarchy(node_table)
+        if hierarchy_only:
+            return {'hierarchy_analysis': hierarchy_analysis}
 
         # 分析相似元素
         similar_analysis = {}
         if target_xpath:
-            similar_elements = self._find_similar_elements(search_index, target_xpath)
+            similar_elements = self._find_similar_elements(search_data, node_table, target_xpath)
             similar_analysis = {
                 'target_xpath': target_xpath,
                 'similar_elements': similar_elements,
@@ -133,7 +256,7 @@ class ElementLocator:
             }
 
         # 分析元素分布
-        distribution_analysis = self._analyze_distribution(search_index)
+        distribution_analysis = self._analyze_distribution(node_table)
 
         return {
             'hierarchy_analysis': hierarchy_analysis,
@@ -141,19 +264,27 @@ class ElementLocator:
             'distribution_analysis': distribution_analysis
         }
 
-    def _analyze_hierarchy(self, search_index: Dict[str, Any]) -> Dict[str, Any]:
-        """分析元素层级结构"""
-        depth_distribution = {}
-        tag_hierarchy = {}
+    def _build_node_table(self, search_index: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """将索引转换为列式节点表（每个字段一个列表，按元素顺序对齐）"""
+        element_ids = list(search_index.keys())
+        elements = list(search_index.values())
 
-        for element_id, element_data in search_index.items():
-            depth = element_data.get('depth', 0)
-            tag = element_data.get('tag', '')
-            path = element_data.get('path', '')
+        return {
+            'element_id': element_ids,
+            'tag': [element_data.get('tag', '') for element_data in elements],
+            'depth': [element_data.get('depth', 0) for element_data in elements],
+            'path': [element_data.get('path', '') for element_data in elements],
+            'attributes': [element_data.get('attributes', {}) for element_data in elements]
+        }
 
-            # 统计深度分布
-            depth_distribution[depth] = depth_distribution.get(depth, 0) + 1
+    def _analyze_hierarchy(self, node_table: Dict[str, List[Any]]) -> Dict[str, Any]:
+        """分析元素层级结构"""
+        # 统计深度分布
+        depth_distribution = dict(Counter(node_table['depth']))
+        tag_hierarchy = {}
 
+        for element_id, tag, depth, path in zip(node_table['element_id'], node_table['tag'],
+                                                 node_table['depth'], node_table['path']):
             # 统计标签层级
             if tag not in tag_hierarchy:
                 tag_hierarchy[tag] = []
@@ -167,48 +298,49 @@ class ElementLocator:
             'depth_distribution': depth_distribution,
             'tag_hierarchy': tag_hierarchy,
             'max_depth': max(depth_distribution.keys()) if depth_distribution else 0,
-            'total_elements': len(search_index)
+            'total_elements': len(node_table['element_id'])
         }
 
-    def _find_similar_elements(self, search_index: Dict[str, Any], target_xpath: str) -> List[Dict[str, Any]]:
-        """查找相似元素"""
-        similar_elements = []
-        target_tag = target_xpath.split('/')[-1] if target_xpath else ''
-
-        for element_id, element_data in search_index.items():
-            tag = element_data.get('tag', '')
-
-            # 查找相同标签的元素
-            if tag == target_tag:
-                similar_elements.append({
-                    'element_id': element_id,
-                    'tag': tag,
-                    'path': element_data.get('path', ''),
-                    'attributes': element_data.get('attributes', {}),
-                    'depth': element_data.get('depth', 0)
-                })
-
-        return similar_elements[:10]  # 限制数量
-
-    def _analyze_distribution(self, search_index: Dict[str, Any]) -> Dict[str, Any]:
+    def _find_similar_elements(self, search_data: Dict[str, Any], node_table: Dict[str, List[Any]],
+                               target_xpath: str) -> List[Dict[str, Any]]:
+        """查找相似元素（与目标XPath最后一级标签相同的元素）"""
+        from tools.html_content_search import copy_attributes
+
+        # 去掉最后一级的位置谓词，如 //ul/li[2] -> li
+        target_tag = target_xpath.rsplit('/', 1)[-1].split('[', 1)[0] if target_xpath else ''
+        rows = self._get_tag_rows(search_data, node_table).get(target_tag, [])
+
+        # 只为保留的结果构建字典
+        return [
+            {
+                'element_id': node_table['element_id'][row],
+                'tag': target_tag,
+                'path': node_table['path'][row],
+                'attributes': copy_attributes(node_table['attributes'][row]),
+                'depth': node_table['depth'][row]
+            }
+            for row in rows[:10]  # 限制数量
+        ]
+
+    def _get_tag_rows(self, search_data: Dict[str, Any], node_table: Dict[str, List[Any]]) -> Dict[str, List[int]]:
+        """标签 -> 节点表行号列表；随搜索数据一起缓存，同一页面只建立一次"""
+        tag_rows = search_data.get('_tag_rows')
+        if tag_rows is None:
+            tag_rows = {}
+            for row, tag in enumerate(node_table['tag']):
+                tag_rows.setdefault(tag, []).append(row)
+            search_data['_tag_rows'] = tag_rows
+        return tag_rows
+
+    def _analyze_distribution(self, node_table: Dict[str, List[Any]]) -> Dict[str, Any]:
         """分析元素分布"""
-        tag_counts = {}
-        attribute_counts = {}
-
-        for element_id, element_data in search_index.items():
-            tag = element_data.get('tag', '')
-            attributes = element_data.get('attributes', {})
-
-            # 统计标签分布
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-
-            # 统计属性分布
-            for attr_name in attributes.keys():
-                attribute_counts[attr_name] = attribute_counts.get(attr_name, 0) + 1
+        # 统计标签分布和属性分布（计数在C层完成）
+        tag_counts = Counter(node_table['tag'])
+        attribute_counts = Counter(chain.from_iterable(node_table['attributes']))
 
         return {
-            'tag_distribution': tag_counts,
-            'attribute_distribution': attribute_counts,
-            'most_common_tags': sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)[:10],
-            'most_common_attributes': sorted(attribute_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+            'tag_distribution': dict(tag_counts),
+            'attribute_distribution': dict(attribute_counts),
+            'most_common_tags': tag_counts.most_common(10),
+            'most_common_attributes': attribute_counts.most_common(10)
         }
@@ -5,20 +5,27 @@ HTML解析核心功能
 """
 
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from bs4 import BeautifulSoup
+import os
 import re
-from tools.html_simplifier import HTMLSimplifier
-from tools.html_content_search import HTMLContentSearch
-from tools.structured_data_store import StructuredDataStore
+from ._shared import shared_simplifier, shared_searcher, shared_data_store
+from ._types import ElementHit
+from .utils import Utils
+
+
+# 没有元素描述时搜索的常见交互元素
+_COMMON_KEYWORDS = ('button', 'input', 'form', 'link', 'title', 'submit')
 
 
 class HTMLParser:
     """HTML解析器"""
 
     def __init__(self):
-        self.simplifier = HTMLSimplifier()
-        self.searcher = HTMLContentSearch()
-        self.data_store = StructuredDataStore()
+        self.simplifier = shared_simplifier()
+        self.searcher = shared_searcher()
+        self.data_store = shared_data_store()
 
     def parse_html_elements(self, html_content: str, element_descriptions: str = "") -> Dict[str, Any]:
         """
@@ -36,35 +43,29 @@ class HTMLParser:
             search_data = self.searcher.build_search_index(html_content)
 
             # 存储数据
-            source_id = f"html_parse_{hash(html_content) % 10000}"
+            source_id = f"html_parse_{Utils.content_digest(html_content)}"
             doc_id = self.data_store.store_html_data(source_id, search_data)
 
-            # 基于描述搜索相关元素
-            search_results = []
+            # 基于描述搜索相关元素（一次遍历索引匹配所有关键字）
             if element_descriptions:
                 # 分割描述中的关键字
                 keywords = element_descriptions.split()
-                for keyword in keywords:
-                    keyword_results = self.searcher.search_by_keyword(keyword)
-                    search_results.extend(keyword_results)
             else:
                 # 如果没有描述，搜索常见的交互元素
-                common_keywords = ['button', 'input', 'form', 'link', 'title', 'submit']
-                for keyword in common_keywords:
-                    keyword_results = self.searcher.search_by_keyword(keyword)
-                    search_results.extend(keyword_results)
+                keywords = _COMMON_KEYWORDS
+            matches = self.searcher.find_keyword_matches(keywords)
 
-            # 去重和排序
+            # 去重，收集到限制数量后即停止；只为保留的结果生成字典
             seen_paths = set()
             unique_results = []
-            for result in search_results:
-                path = result.get('path', '')
+            for match in matches:
+                hit = ElementHit(*match)
+                path = hit.get('path', '')
                 if path not in seen_paths:
                     seen_paths.add(path)
-                    unique_results.append(result)
-
-            # 限制结果数量
-            unique_results = unique_results[:20]
+                    unique_results.append(hit.to_dict())
+                    if len(unique_results) >= 20:  # 限制结果数量
+                        break
 
             # 生成XPath和CSS选择器
             parsed_elements = []
@@ -83,12 +84,39 @@ class HTMLParser:
                 'doc_id': doc_id,
                 'elements': parsed_elements,
                 'search_results': unique_results,
-                'simplification_stats': search_data.get('simplification_stats', {})
+                'simplification_stats': dict(search_data.get('simplification_stats', {}))
             }
 
         except Exception as e:
             return {'error': f"HTML解析错误: {str(e)}"}
 
+    def parse_html_elements_batch(self, html_contents: List[str], element_descriptions: str = "",
+                                  max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        批量解析多个HTML内容
+
+        各文档相互独立，在进程池中并行解析；每个工作进程只创建一次解析器并在任务间复用
+
+        Args:
+            html_contents: HTML内容列表
+            element_descriptions: 用户对要查找的元素的描述（对所有文档相同）
+            max_workers: 最大工作进程数（默认为CPU核数）
+
+        Returns:
+            与输入顺序一致的解析结果列表
+        """
+        if len(html_contents) <= 1:
+            # 单个文档不值得启动进程池
+            return [self.parse_html_elements(html_content, element_descriptions) for html_content in html_contents]
+
+        workers = max_workers or os.cpu_count() or 1
+        # 每个工作进程分到约4批任务，减少进程间通信次数
+        chunksize = max(1, len(html_contents) // (workers * 4))
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as executor:
+            return list(executor.map(_parse_in_worker, html_contents, repeat(element_descriptions),
+                                     chunksize=chunksize))
+
     def _generate_xpath(self, element_data: Dict[str, Any]) -> str:
         """生成元素的XPath"""
         try:
@@ -141,31 +169,31 @@ class HTMLParser:
             search_data = self.searcher.build_search_index(html_content)
 
             # 存储数据
-            source_id = f"search_extract_{hash(html_content) % 10000}"
+            source_id = f"search_extract_{Utils.content_digest(html_content)}"
             doc_id = self.data_store.store_html_data(source_id, search_data)
 
-            # 执行搜索
-            all_results = []
-            for keyword in keywords:
-                results = self.searcher.search_by_keyword(keyword, search_type)
-                all_results.extend(results)
+            # 执行搜索（一次遍历索引匹配所有关键词），截断前不复制索引项
+            all_results = [
+                ElementHit(*match)
+                for match in self.searcher.find_keyword_matches(keywords, search_type)
+            ]
 
             # 去重和排序
             unique_results = self._deduplicate_results(all_results)
 
             return {
                 'doc_id': doc_id,
-                'search_results': unique_results,
+                'search_results': [hit.to_dict() for hit in unique_results],
                 'keywords': keywords,
                 'simplified_html': search_data.get('simplified_html', ''),
-                'stats': search_data.get('simplification_stats', {})
+                'stats': dict(search_data.get('simplification_stats', {}))
             }
 
         except Exception as e:
             return {'error': f"搜索提取错误: {str(e)}"}
 
-    def _deduplicate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """去重搜索结果"""
+    def _deduplicate_results(self, results: List[Dict[str, Any]], limit: int = 50) -> List[Dict[str, Any]]:
+        """去重搜索结果，保留每个元素第一次出现的结果，收集到limit个后即停止"""
         seen = set()
         unique_results = []
 
@@ -175,8 +203,10 @@ class HTMLParser:
             if identifier not in seen:
                 seen.add(identifier)
                 unique_results.append(result)
+                if len(unique_results) >= limit:
+                    break
 
-        return unique_results[:50]  # 限制数量
+        return unique_results
 
     def get_stored_data(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -189,3 +219,18 @@ class HTMLParser:
             存储的数据
         """
         return self.data_store.load_html_data(doc_id)
+
+
+# 批量解析工作进程内复用的解析器（由 _init_parse_worker 在每个进程中创建一次）
+_worker_parser = None
+
+
+def _init_parse_worker():
+    """初始化批量解析工作进程"""
+    global _worker_parser
+    _worker_parser = HTMLParser()
+
+
+def _parse_in_worker(html_content: str, element_descriptions: str) -> Dict[str, Any]:
+    """解析单个HTML内容（在工作进程中运行）"""
+    return _worker_parser.parse_html_elements(html_content, element_descriptions)
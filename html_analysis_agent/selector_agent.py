@@ -5,11 +5,10 @@ XPath和CSS选择器生成器
 """
 
 from typing import Dict, List, Any, Optional, Tuple
-from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
-from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, NavigableString
+from collections import OrderedDict
+from copy import copy
+from itertools import islice
 import os
 import re
 
@@ -18,9 +17,26 @@ from .element_locator import ElementLocator
 from .utils import Utils
 
 
+# 构建内容映射时遍历的有意义的内容标签
+_CONTENT_TAGS = frozenset({
+    'p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'a', 'button', 'input', 'textarea', 'select', 'option',
+    'li', 'dt', 'dd', 'blockquote', 'pre', 'code'
+})
+
+# 从XPath中提取id值
+_XPATH_ID_RE = re.compile(r"@id='([^']*)'")
+
+
 class SelectorAgent:
     """XPath和CSS选择器生成智能体"""
 
+    # 按内容摘要缓存的简化结果数量
+    SIMPLIFY_CACHE_SIZE = 8
+
+    # 按内容摘要缓存的解析树数量（解析树占用内存较多，只保留最近几个页面）
+    SOUP_CACHE_SIZE = 4
+
     def __init__(
         self,
         model_name: str = "gemini-2.5-flash",
@@ -41,21 +57,15 @@ class SelectorAgent:
             api_key: API密钥（可选，从环境变量读取）
             api_base: API基础URL（可选，从环境变量读取）
         """
-        # 加载环境变量
-        load_dotenv()
-
-        # 配置LLM
-        api_key = api_key or os.getenv("OPENAI_API_KEY")
-        api_base = api_base or os.getenv("OPENAI_API_BASE")
-
-        self.llm = ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            max_tokens=max_tokens,
-            max_retries=max_retries,
-            api_key=api_key,
-            base_url=api_base
-        )
+        # LLM配置（客户端在首次生成选择器时才创建）
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_retries = max_retries
+        self._api_key = api_key
+        self._api_base = api_base
+        self._llm = None
+        self._memory = None
 
         # 初始化工具
         # 动态导入以避免循环依赖
@@ -68,67 +78,139 @@ class SelectorAgent:
         # 修复HTMLSimplifier的解析器引用
         self.html_simplifier.html_parser = self.html_parser
 
-        # 内存检查点
-        self.memory = InMemorySaver()
-
         # 存储简化后的HTML结构和原始内容映射
         self.simplified_structure = None
         self.content_mapping = {}  # 存储标签ID到内容的映射
 
-    def analyze_html_with_simplification(self, html_content: str) -> Dict[str, Any]:
+        # 内容摘要 -> (简化HTML, 简化统计)，同一页面多次分析时只简化一次
+        self._simplify_cache = OrderedDict()
+
+        # 内容摘要 -> BeautifulSoup解析树，内容映射和元素查找共用同一次解析
+        self._soup_cache = OrderedDict()
+
+    @property
+    def llm(self):
+        """LLM客户端（首次访问时创建）"""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            from dotenv import load_dotenv
+
+            # 加载环境变量
+            load_dotenv()
+
+            self._llm = ChatOpenAI(
+                model=self.model_name,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                max_retries=self.max_retries,
+                api_key=self._api_key or os.getenv("OPENAI_API_KEY"),
+                base_url=self._api_base or os.getenv("OPENAI_API_BASE")
+            )
+        return self._llm
+
+    @property
+    def memory(self):
+        """内存检查点（首次访问时创建）"""
+        if self._memory is None:
+            from langgraph.checkpoint.memory import InMemorySaver
+            self._memory = InMemorySaver()
+        return self._memory
+
+    def analyze_html_with_simplification(self, html_content: str, include_details: bool = True) -> Dict[str, Any]:
         """
         使用HTML简化技术分析HTML内容
 
         Args:
             html_content: 原始HTML内容
+            include_details: 是否同时提取结构树和内容映射（需要完整的解析树，
+                只需要简化结果和统计时可关闭）
 
         Returns:
             包含简化结构和内容的分析结果
         """
-        # 简化HTML结构
-        simplified_html = self.html_simplifier.simplify_html_string(html_content)
-
-        # 提取结构树
-        structure_tree = self.html_simplifier.extract_structure_tree(html_content)
+        # 简化HTML结构并获取简化统计（需要解析树时由解析树的副本简化，不再单独解析一次）
+        soup = self._get_soup(html_content) if include_details else None
+        simplified_html, stats = self._simplify(html_content, soup)
 
-        # 构建内容映射（为简化后的标签创建内容索引）
-        self._build_content_mapping(html_content)
-
-        # 获取简化统计
-        stats = self.html_simplifier.get_simplification_stats()
-
-        return {
+        result = {
             'simplified_html': simplified_html,
-            'structure_tree': structure_tree,
-            'content_mapping': self.content_mapping,
             'simplification_stats': stats
         }
 
+        if include_details:
+            # 提取结构树（与内容映射共用同一棵缓存的解析树；简化使用的是副本，原树未被修改）
+            result['structure_tree'] = self.html_simplifier.extract_structure_tree(html_content, soup=soup)
+
+            # 构建内容映射（为简化后的标签创建内容索引）
+            self._build_content_mapping(html_content)
+            result['content_mapping'] = self.content_mapping
+
+        return result
+
+    def _simplify(self, html_content: str, soup: Optional[BeautifulSoup] = None) -> Tuple[str, Dict[str, Any]]:
+        """简化HTML，相同内容直接复用缓存的结果；传入已解析的树时简化其副本"""
+        cache_key = Utils.content_digest(html_content)
+        cached = self._simplify_cache.get(cache_key)
+        if cached is not None:
+            self._simplify_cache.move_to_end(cache_key)
+        else:
+            if soup is not None:
+                simplified_html = self.html_simplifier.simplify_soup(copy(soup))
+                cached = (simplified_html, self.html_simplifier.removed_content_stats.copy())
+            else:
+                cached = self.html_simplifier.simplify_html_with_stats(html_content)
+            self._simplify_cache[cache_key] = cached
+            if len(self._simplify_cache) > self.SIMPLIFY_CACHE_SIZE:
+                self._simplify_cache.popitem(last=False)
+
+        simplified_html, stats = cached
+        return simplified_html, dict(stats)
+
+    def _get_soup(self, html_content: str) -> BeautifulSoup:
+        """解析HTML，相同内容直接复用缓存的解析树（调用方只读不修改）"""
+        cache_key = Utils.content_digest(html_content)
+        soup = self._soup_cache.get(cache_key)
+        if soup is not None:
+            self._soup_cache.move_to_end(cache_key)
+            return soup
+
+        soup = BeautifulSoup(html_content, 'lxml')
+        self._soup_cache[cache_key] = soup
+        if len(self._soup_cache) > self.SOUP_CACHE_SIZE:
+            self._soup_cache.popitem(last=False)
+        return soup
+
     def _build_content_mapping(self, html_content: str) -> None:
         """构建内容映射，为简化后的标签创建内容索引"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self._get_soup(html_content)
 
-        # 遍历所有有意义的内容标签
-        content_tags = ['p', 'div', 'span', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-                       'a', 'button', 'input', 'textarea', 'select', 'option',
-                       'li', 'dt', 'dd', 'blockquote', 'pre', 'code']
+        # 同一解析树内共享已生成的祖先路径和兄弟元素位置
+        path_cache = {}
+        step_cache = {}
 
-        for tag in soup.find_all(content_tags):
-            # 为每个标签生成唯一ID
-            tag_id = self._generate_tag_id(tag)
+        # 遍历所有有意义的内容标签（直接按标签名过滤，不经过bs4的通用匹配器）
+        for tag in soup.descendants:
+            if tag.name not in _CONTENT_TAGS:
+                continue
 
-            # 提取文本内容
-            text_content = tag.get_text(strip=True)
+            # 提取文本内容（只有一个文本子节点时直接取该节点，省去递归遍历子孙节点）
+            contents = tag.contents
+            if len(contents) == 1 and type(contents[0]) is NavigableString:
+                text_content = contents[0].strip()
+            else:
+                text_content = tag.get_text(strip=True)
 
             # 提取属性
             attributes = dict(tag.attrs)
 
             if text_content or attributes:
+                # 只为保留的标签生成唯一ID（无id和class时需要序列化标签计算摘要）
+                tag_id = self._generate_tag_id(tag)
                 self.content_mapping[tag_id] = {
                     'tag': tag.name,
                     'text_content': text_content[:200] + '...' if len(text_content) > 200 else text_content,
                     'attributes': attributes,
-                    'xpath': self._generate_xpath(tag),
+                    'xpath': self._generate_xpath(tag, path_cache, step_cache),
                     'css_selector': self._generate_css_selector(tag)
                 }
 
@@ -139,30 +221,71 @@ class SelectorAgent:
         elif tag.get('class'):
             return f"class_{'_'.join(tag['class'][:2])}"
         else:
-            # 使用标签名和位置生成ID
-            return f"tag_{tag.name}_{hash(str(tag)) % 10000}"
+            # 使用标签名和标签内容摘要生成ID（跨进程稳定，不会因取模而冲突）
+            return f"tag_{tag.name}_{Utils.content_digest(str(tag), digest_size=8)}"
+
+    def _generate_xpath(self, tag, path_cache: Optional[Dict[int, str]] = None,
+                        step_cache: Optional[Dict[int, Dict[int, str]]] = None) -> str:
+        """
+        生成XPath表达式
+
+        Args:
+            tag: 目标标签
+            path_cache: 已生成的结构路径（按标签id()），同一解析树的多个标签共享祖先路径
+            step_cache: 每个父节点下子元素的路径片段（按父节点id()），每个父节点只遍历一次子节点
 
-    def _generate_xpath(self, tag) -> str:
-        """生成XPath表达式"""
+        Returns:
+            XPath表达式
+        """
         # 简化版XPath生成
         if tag.get('id'):
             return f"//*[@id='{tag['id']}']"
 
-        xpath_parts = []
-        current = tag
-        while current and current.name != '[document]':
-            # 计算兄弟元素位置
-            siblings = [s for s in current.parent.children if hasattr(s, 'name') and s.name == current.name]
-            if len(siblings) > 1:
-                index = siblings.index(current) + 1
-                xpath_parts.append(f"{current.name}[{index}]")
-            else:
-                xpath_parts.append(current.name)
+        if path_cache is None:
+            path_cache = {}
+        if step_cache is None:
+            step_cache = {}
 
+        # 向上找到第一个已生成路径的祖先
+        pending = []
+        prefix = ""
+        current = tag
+        while current is not None and current.name != '[document]':
+            cached = path_cache.get(id(current))
+            if cached is not None:
+                prefix = cached
+                break
+            pending.append(current)
             current = current.parent
 
-        xpath_parts.reverse()
-        return "/" + "/".join(xpath_parts)
+        # 自上而下补全路径并缓存
+        for node in reversed(pending):
+            prefix = f"{prefix}/{self._xpath_step(node, step_cache)}"
+            path_cache[id(node)] = prefix
+
+        return prefix or "/"
+
+    def _xpath_step(self, tag, step_cache: Dict[int, Dict[int, str]]) -> str:
+        """计算标签在父节点下的路径片段（同名兄弟元素多于一个时带位置）"""
+        parent = tag.parent
+        steps = step_cache.get(id(parent))
+        if steps is None:
+            # 一次遍历父节点的子元素，按标签名分组计算位置
+            groups = {}
+            for child in parent.children:
+                if child.name is not None:
+                    groups.setdefault(child.name, []).append(child)
+
+            steps = {}
+            for name, siblings in groups.items():
+                if len(siblings) > 1:
+                    for index, sibling in enumerate(siblings, 1):
+                        steps[id(sibling)] = f"{name}[{index}]"
+                else:
+                    steps[id(siblings[0])] = name
+            step_cache[id(parent)] = steps
+
+        return steps[id(tag)]
 
     def _generate_css_selector(self, tag) -> str:
         """生成CSS选择器"""
@@ -230,12 +353,14 @@ HTML页面结构（已简化，去除了具体内容）：
 
         # 添加关键内容映射（只包含相关信息）
         context_parts.append("\n=== 关键元素内容映射 ===")
-        relevant_mappings = []
-        for tag_id, info in analysis_result['content_mapping'].items():
-            if info['text_content'] or info['attributes']:
-                relevant_mappings.append(f"{tag_id}: {info['tag']} - {info['text_content'][:100]}")
+        relevant_mappings = (
+            f"{tag_id}: {info['tag']} - {info['text_content'][:100]}"
+            for tag_id, info in analysis_result['content_mapping'].items()
+            if info['text_content'] or info['attributes']
+        )
 
-        context_parts.append("\n".join(relevant_mappings[:20]))  # 限制数量
+        # 限制数量，只格式化用到的前20项
+        context_parts.append("\n".join(islice(relevant_mappings, 20)))
 
         # 添加简化统计信息
         stats = analysis_result['simplification_stats']
@@ -263,15 +388,15 @@ HTML页面结构（已简化，去除了具体内容）：
         # 先分析HTML结构
         analysis_result = self.analyze_html_with_simplification(html_content)
 
-        # 使用原始HTML进行元素定位
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # 使用原始HTML进行元素定位（复用构建内容映射时的解析树）
+        soup = self._get_soup(html_content)
 
         try:
             if selector_type == 'xpath':
                 # 简化版XPath查找
                 if '[@id=' in selector:
                     # 提取ID值
-                    id_match = re.search(r"@id='([^']*)'", selector)
+                    id_match = _XPATH_ID_RE.search(selector)
                     if id_match:
                         element = soup.find(attrs={'id': id_match.group(1)})
                         elements = [element] if element else []
@@ -287,9 +412,9 @@ HTML页面结构（已简化，去除了具体内容）：
                     element = soup.find(attrs={'id': element_id})
                     elements = [element] if element else []
                 elif selector.startswith('.'):
-                    # 类选择器
+                    # 类选择器（按class列表中的完整类名匹配，不再对每个元素回调Python函数）
                     class_name = selector[1:]
-                    element = soup.find(attrs={'class': lambda x: x and class_name in x})
+                    element = soup.find(class_=class_name)
                     elements = [element] if element else []
                 else:
                     elements = []
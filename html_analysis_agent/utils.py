@@ -5,8 +5,36 @@
 """
 
 from typing import List, Dict, Any, Union
+from collections import Counter
+from functools import lru_cache
+import hashlib
 import json
 import os
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
+
+# 有效HTML至少包含的基本标签开头（不区分大小写，只做ASCII大小写折叠，与lower()后比较一致）
+_BASIC_TAG_RE = re.compile(r'<(?:html|head|body|div|p|span)', re.IGNORECASE | re.ASCII)
+
+# 提取关键词时排除的常见停用词
+_STOP_WORDS = frozenset({
+    '的', '了', '和', '是', '就', '都', '而', '及', '与', '或', '一个', '没有',
+    '我们', '你们', '他们', '这个', '那个', '这些', '那些', '这样', '那样'
+})
+
+# 提取关键词时去除的首尾标点
+_KEYWORD_STRIP_CHARS = '，。；：！？""（）【】《》'
+
+
+@lru_cache(maxsize=16)
+def _read_text_file(file_path: str, mtime_ns: int, size: int) -> str:
+    """读取文件内容；修改时间和大小参与缓存键，文件变化后自动重新读取"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 
 class Utils:
@@ -27,7 +55,7 @@ class Utils:
         try:
             with open(filename, 'w', encoding='utf-8') as f:
                 if isinstance(results, (dict, list)):
-                    json.dump(results, f, ensure_ascii=False, indent=2)
+                    f.write(Utils.dumps_json_pretty(results))
                 else:
                     f.write(str(results))
             return True
@@ -35,6 +63,61 @@ class Utils:
             print(f"保存文件错误: {e}")
             return False
 
+    @staticmethod
+    def dumps_json_bytes(data: Any) -> bytes:
+        """
+        将数据序列化为单行UTF-8编码的JSON
+
+        安装了orjson时使用orjson，否则使用标准库json；非字符串键转换为字符串，
+        无法序列化的对象转换为str
+
+        Args:
+            data: 要序列化的数据
+
+        Returns:
+            JSON字节串
+        """
+        if orjson is not None:
+            return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def dumps_json_pretty(data: Any) -> str:
+        """
+        将数据序列化为缩进两格的JSON字符串
+
+        安装了orjson时使用orjson，orjson无法处理的数据（如超过64位的整数）回退到标准库json，
+        输出格式与json.dumps(data, ensure_ascii=False, indent=2)一致
+
+        Args:
+            data: 要序列化的数据
+
+        Returns:
+            JSON字符串
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except orjson.JSONEncodeError:
+                pass
+        return json.dumps(data, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def content_digest(content: str, digest_size: int = 16) -> str:
+        """
+        计算内容摘要
+
+        与内置hash()不同，结果跨进程稳定，可用作缓存键和文档ID
+
+        Args:
+            content: 文本内容
+            digest_size: 摘要字节数
+
+        Returns:
+            十六进制摘要字符串
+        """
+        return hashlib.blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=digest_size).hexdigest()
+
     @staticmethod
     def load_html_file(file_path: str) -> str:
         """
@@ -47,10 +130,11 @@ class Utils:
             HTML内容
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            # 同一文件未变化时直接复用已读取的内容
+            stat = os.stat(file_path)
+            return _read_text_file(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
         except Exception as e:
-            raise Exception(f"读取HTML文件错误: {e}")
+            raise Exception(f"读取HTML文件错误: {e}") from e
 
     @staticmethod
     def validate_html_content(html_content: str) -> bool:
@@ -70,11 +154,8 @@ class Utils:
         if len(html_content) < 10:
             return False
 
-        # 检查是否包含基本的HTML标签
-        basic_tags = ['<html', '<head', '<body', '<div', '<p', '<span']
-        has_basic_tags = any(tag in html_content.lower() for tag in basic_tags)
-
-        return has_basic_tags
+        # 检查是否包含基本的HTML标签（一次扫描，找到第一个即停止，不生成小写副本）
+        return _BASIC_TAG_RE.search(html_content) is not None
 
     @staticmethod
     def clean_text(text: str) -> str:
@@ -90,13 +171,33 @@ class Utils:
         if not text:
             return ""
 
-        # 移除多余的空白字符
-        text = ' '.join(text.split())
+        # 移除多余的空白字符（split()已按包括换行、回车、制表符在内的所有空白切分，结果无首尾空白）
+        return ' '.join(text.split())
+
+    @staticmethod
+    def text_prefix(element, max_length: int) -> str:
+        """
+        获取元素文本的前缀
 
-        # 移除特殊字符
-        text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
+        结果与 element.get_text()[:max_length] 相同，但只拼接前缀所需的文本节点，
+        不会为大容器生成整棵子树的文本
 
-        return text.strip()
+        Args:
+            element: BeautifulSoup元素
+            max_length: 最大字符数
+
+        Returns:
+            文本前缀
+        """
+        parts = []
+        length = 0
+        for string in element.strings:
+            parts.append(string)
+            length += len(string)
+            if length >= max_length:
+                break
+
+        return ''.join(parts)[:max_length]
 
     @staticmethod
     def extract_keywords(text: str, top_n: int = 10) -> List[str]:
@@ -111,21 +212,12 @@ class Utils:
             关键词列表
         """
         try:
-            # 简单的关键词提取（基于词频）
-            words = text.split()
-            word_count = {}
-
-            # 统计词频（排除常见停用词）
-            stop_words = {'的', '了', '和', '是', '就', '都', '而', '及', '与', '或', '一个', '没有', '我们', '你们', '他们', '这个', '那个', '这些', '那些', '这样', '那样'}
-
-            for word in words:
-                word = word.strip('，。；：！？""''（）【】《》')
-                if len(word) > 1 and word not in stop_words:
-                    word_count[word] = word_count.get(word, 0) + 1
+            # 简单的关键词提取（基于词频，排除常见停用词）
+            words = (word.strip(_KEYWORD_STRIP_CHARS) for word in text.split())
+            word_count = Counter(word for word in words if len(word) > 1 and word not in _STOP_WORDS)
 
-            # 返回频率最高的词
-            sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-            return [word for word, count in sorted_words[:top_n]]
+            # 返回频率最高的词（频率相同时保持首次出现的顺序）
+            return [word for word, count in word_count.most_common(top_n)]
 
         except Exception:
             return []
@@ -146,20 +238,20 @@ class Utils:
             if format_type == 'json':
                 if isinstance(data, str):
                     return data
-                return json.dumps(data, ensure_ascii=False, indent=2)
+                return Utils.dumps_json_pretty(data)
 
             elif format_type == 'html':
                 if isinstance(data, str):
                     return f"<html><body><pre>{data}</pre></body></html>"
                 else:
-                    json_str = json.dumps(data, ensure_ascii=False, indent=2)
+                    json_str = Utils.dumps_json_pretty(data)
                     return f"<html><body><pre>{json_str}</pre></body></html>"
 
             else:  # text format
                 if isinstance(data, str):
                     return data
                 elif isinstance(data, (dict, list)):
-                    return json.dumps(data, ensure_ascii=False, indent=2)
+                    return Utils.dumps_json_pretty(data)
                 else:
                     return str(data)
 
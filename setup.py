@@ -44,6 +44,9 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        'speedups': ['orjson', 'cdifflib'],
+    },
     entry_points={
         'console_scripts': [
             'html-analysis-agent=html_analysis_agent.cli:main',
@@ -0,0 +1,36 @@
+"""
+HTML内容搜索器的回归测试
+"""
+
+from tools.html_content_search import HTMLContentSearch
+
+
+def _search(html_content, keyword):
+    searcher = HTMLContentSearch()
+    searcher.build_search_index(html_content, simplify=False)
+    return searcher.search_by_keyword(keyword)
+
+
+def test_empty_keyword_matches_every_element_without_attributes():
+    """空关键字匹配所有元素（页面没有任何属性时拼接的属性串为空）"""
+    results = _search('<p>hi</p>', '')
+
+    assert [item['tag'] for item in results] == ['[document]', 'html', 'body', 'p']
+
+
+def test_empty_keyword_matches_every_element_with_attributes():
+    """空关键字匹配所有元素（页面有属性）"""
+    results = _search('<p class="a">hi</p>', '')
+
+    # 按匹配分数排序，带属性的p元素分数最高
+    assert [item['tag'] for item in results] == ['p', '[document]', 'html', 'body']
+    assert results[0]['match_reasons'] == ['tag_match', 'text_match', 'attr_match_class']
+
+
+def test_empty_keyword_in_keyword_list():
+    """关键字列表中含空关键字时其他关键字照常匹配"""
+    searcher = HTMLContentSearch()
+    searcher.build_search_index('<p>hi</p>', simplify=False)
+    results = searcher.search_by_keywords(['', 'hi'])
+
+    assert [item['matched_keyword'] for item in results] == ['', '', '', '', 'hi', 'hi', 'hi', 'hi']
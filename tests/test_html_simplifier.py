@@ -0,0 +1,21 @@
+"""
+HTML简化器的回归测试
+"""
+
+from tools.html_simplifier import HTMLSimplifier
+
+
+def test_doctype_is_kept_and_not_counted_as_text():
+    """文档类型声明原样保留，不被替换为文本占位符"""
+    simplifier = HTMLSimplifier()
+    simplified = simplifier.simplify_html_string(
+        '<!DOCTYPE html><html><head><title>标题</title></head>'
+        '<body><!-- 注释 --><p>正文</p></body></html>'
+    )
+
+    assert simplified.startswith('<!DOCTYPE html>')
+    assert '[TEXT]<html>' not in simplified
+    assert '<title>[TEXT]</title>' in simplified
+    assert '<p>[TEXT]</p>' in simplified
+    assert simplifier.removed_content_stats['text_nodes'] == 2
+    assert simplifier.removed_content_stats['comments'] == 1
@@ -4,80 +4,333 @@ HTML内容搜索工具
 基于HTML简化结构进行高效的内容搜索和标签定位
 """
 
-from typing import Dict, List, Any, Optional, Tuple
-from bs4 import BeautifulSoup
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
+from bisect import bisect_right
+from bs4.builder import HTMLTreeBuilder
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+import hashlib
 import re
+import sys
 from pathlib import Path
 
+from lxml import etree
+
+
+# 常用class名的驻留表（先进先出淘汰），相同class名的元素共享同一个字符串对象
+_CLASS_INTERN_SIZE = 256
+_class_intern: Dict[str, str] = {}
+
+
+def _intern_class(name: str) -> str:
+    """返回class名的共享字符串"""
+    shared = _class_intern.get(name)
+    if shared is None:
+        if len(_class_intern) >= _CLASS_INTERN_SIZE:
+            del _class_intern[next(iter(_class_intern))]
+        shared = _class_intern[name] = name
+    return shared
+
+
+# 取值为空白分隔列表的属性（如class），与BeautifulSoup的拆分规则一致
+_LIST_ATTRIBUTES = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+_UNIVERSAL_LIST_ATTRIBUTES = frozenset(_LIST_ATTRIBUTES.get('*', ()))
+_NON_WHITESPACE_RE = re.compile(r'\S+')
+
+# 内部文本不算作普通文本的标签（与BeautifulSoup的get_text一致，脚本、样式等只计入标签自身的文本）
+_STRING_CONTAINER_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_STRING_CONTAINERS)
+
+# 保留空白的标签；其他位置只含ASCII空白的文本折叠为一个换行或空格（与BeautifulSoup一致）
+_PRESERVE_WHITESPACE_TAGS = frozenset(HTMLTreeBuilder.DEFAULT_PRESERVE_WHITESPACE_TAGS)
+_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# 索引根节点的名称（与BeautifulSoup文档对象的名称一致）
+_DOCUMENT_NAME = '[document]'
+
+
+def _element_attributes(tag: str, attrib) -> Dict[str, Any]:
+    """复制元素属性（属性名驻留），列表型属性按空白拆分为列表"""
+    # 属性名只有少数几种，驻留后所有索引项共享
+    attributes = {sys.intern(attr_name): attr_value for attr_name, attr_value in attrib.items()}
+    if attributes:
+        tag_specific = _LIST_ATTRIBUTES.get(tag)
+        for attr_name, attr_value in attributes.items():
+            if attr_name in _UNIVERSAL_LIST_ATTRIBUTES or (tag_specific and attr_name in tag_specific):
+                attributes[attr_name] = _NON_WHITESPACE_RE.findall(attr_value)
+    return attributes
+
+
+def copy_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    """复制属性字典（列表型属性值一并复制）"""
+    return {name: list(value) if isinstance(value, list) else value for name, value in attributes.items()}
+
+
+def copy_index_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    复制索引项，返回给调用方的结果不引用缓存的共享索引
+
+    Args:
+        item: 索引项
+
+    Returns:
+        索引项及其属性的副本（调用方修改副本不会影响之后的搜索和分析）
+    """
+    result = item.copy()
+    result['attributes'] = copy_attributes(item['attributes'])
+    return result
+
+
+def _collapse_whitespace(text: str) -> str:
+    """只含ASCII空白的文本折叠为一个换行（含换行时）或空格"""
+    if text.strip(_ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+
+@lru_cache(maxsize=512)
+def _compiled_css(selector: str) -> Tuple[str, ...]:
+    """解析CSS选择器为 (类型, 参数...) 元组，相同选择器只解析一次"""
+    if selector.startswith('#'):
+        return ('id', selector[1:])
+    if selector.startswith('.'):
+        return ('class', selector[1:])
+    if selector.startswith('[') and selector.endswith(']'):
+        attr_match = re.search(r'\[([^=]+)=([^\]]+)\]', selector)
+        if attr_match:
+            return ('attr', attr_match.group(1), attr_match.group(2).strip('"\''))
+        return ('none',)
+    return ('tag', selector)
+
+
+@lru_cache(maxsize=512)
+def _compiled_xpath(selector: str) -> Tuple[str, ...]:
+    """解析XPath表达式为 (类型, 参数...) 元组，相同表达式只解析一次"""
+    if '[@id=' in selector:
+        id_match = re.search(r"@id='([^']*)'", selector)
+        return ('id', id_match.group(1)) if id_match else ('none',)
+    if '[@class=' in selector:
+        class_match = re.search(r"@class='([^']*)'", selector)
+        return ('class', class_match.group(1)) if class_match else ('none',)
+    return ('tag_in', selector)
+
+
+# 可以直接查倒排索引的选择器类型
+_INDEXED_SELECTOR_KINDS = frozenset({'id', 'class', 'tag'})
+
+
+def _never_matches(item: Dict[str, Any]) -> bool:
+    """无法解析的选择器不匹配任何元素"""
+    return False
+
+
+@lru_cache(maxsize=512)
+def _compiled_predicate(compiled: Tuple[str, ...]) -> Callable[[Dict[str, Any]], bool]:
+    """把解析后的选择器转换为只做一次比较的匹配函数，相同选择器只生成一次"""
+    kind = compiled[0]
+    if kind == 'id':
+        element_id = compiled[1]
+        return lambda item: item['attributes'].get('id') == element_id
+    if kind == 'class':
+        class_name = compiled[1]
+        return lambda item: class_name in item['attributes'].get('class', [])
+    if kind == 'attr':
+        attr_name, attr_value = compiled[1], compiled[2]
+        return lambda item: item['attributes'].get(attr_name) == attr_value
+    if kind == 'tag':
+        tag = compiled[1]
+        return lambda item: item['tag'] == tag
+    if kind == 'tag_in':
+        selector = compiled[1]
+        return lambda item: item['tag'] in selector
+    return _never_matches
+
+
+@lru_cache(maxsize=128)
+def _compiled_keywords(keywords_lower: Tuple[str, ...]) -> "re.Pattern[str]":
+    """把一组小写关键字编译为一个合并的正则，用于快速排除不含任何关键字的字段"""
+    return re.compile('|'.join(map(re.escape, keywords_lower)))
+
+
+# 拼接字段时使用的分隔符；关键字不含分隔符时，匹配不会跨越两个字段
+_FIELD_SEPARATOR = '\x00'
+
+
+def _field_hits(search: Callable, field: Tuple[str, List[int], List[int]], hits: Set[int]) -> None:
+    """
+    在拼接后的字段中查找含有关键字的字段，把所属的行号加入hits
+
+    每个字段最多匹配一次，命中后直接从下一个字段开始继续查找
+
+    Args:
+        search: 合并关键字正则的search方法
+        field: (拼接后的字段, 各字段的起始位置, 各字段所属的行号)
+        hits: 命中的行号集合
+    """
+    blob, starts, row_ids = field
+    if not starts:
+        # 没有任何字段（空的拼接串仍可能被空关键字匹配）
+        return
+    last = len(starts) - 1
+    pos = 0
+    while True:
+        match = search(blob, pos)
+        if match is None:
+            return
+        field_index = bisect_right(starts, match.start()) - 1
+        hits.add(row_ids[field_index])
+        if field_index == last:
+            return
+        pos = starts[field_index + 1]
+
 
 class HTMLContentSearch:
     """HTML内容搜索器"""
 
+    # 按内容摘要缓存的索引数量，同一页面被多个分析器使用时只解析一次
+    INDEX_CACHE_SIZE = 8
+
+    # 所有实例共享的索引缓存：内容摘要 -> 搜索数据
+    _index_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
     def __init__(self):
         """初始化搜索器"""
         self.search_results = []
         self.content_index = {}
+        self._search_data = {'search_index': self.content_index}
 
-    def build_search_index(self, html_content: str) -> Dict[str, Any]:
+    def build_search_index(self, html_content: str, simplify: bool = True) -> Dict[str, Any]:
         """
         构建搜索索引
 
+        相同内容的HTML会直接复用缓存的索引，不再重复解析
+
         Args:
             html_content: 原始HTML内容
+            simplify: 是否同时生成简化HTML（仅需索引时可关闭，省去一次解析）
 
         Returns:
             搜索索引和简化结构
         """
-        # 解析HTML
-        soup = BeautifulSoup(html_content, 'lxml')
+        cache_key = hashlib.blake2b(html_content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+        search_data = self._index_cache.get(cache_key)
+
+        if search_data is None:
+            # 解析HTML（直接使用lxml的元素树，不构建BeautifulSoup对象）
+            parser = etree.HTMLParser()
+            parser.feed(html_content)
+            root = parser.close()
+
+            # 构建索引
+            self.content_index = {}
+            self._index_document(root)
+
+            search_data = {'search_index': self.content_index}
+            self._index_cache[cache_key] = search_data
+            if len(self._index_cache) > self.INDEX_CACHE_SIZE:
+                self._index_cache.popitem(last=False)
+        else:
+            self._index_cache.move_to_end(cache_key)
+            self.content_index = search_data['search_index']
+        self._search_data = search_data
+
+        if simplify and 'simplified_html' not in search_data:
+            # 简化HTML结构
+            from .html_simplifier import HTMLSimplifier
+            simplified_html, stats = HTMLSimplifier().simplify_html_with_stats(html_content)
+            search_data['simplified_html'] = simplified_html
+            search_data['simplification_stats'] = stats
+
+        return search_data
+
+    def _index_document(self, root) -> None:
+        """以文档根节点为第一个索引项建立索引"""
+        index_item = self._new_index_item(_DOCUMENT_NAME, {}, 0, "")
+        if root is None:
+            # 空文档
+            index_item['text_content'] = index_item['full_text'] = ''
+        else:
+            full_text, text_content = self._traverse_and_index(root, 1, _DOCUMENT_NAME, None, False)
+            index_item['text_content'] = text_content
+            index_item['full_text'] = full_text
+
+    def _new_index_item(self, tag: str, attributes: Dict[str, Any], depth: int, parent_path: str) -> Dict[str, Any]:
+        """按文档顺序登记索引项，文本字段在子元素处理完后填入"""
+        element_id = f"element_{len(self.content_index)}"
+        index_item = {
+            'element_id': element_id,
+            'tag': tag,
+            'path': f"{parent_path}/{tag}" if parent_path else tag,
+            'depth': depth,
+            'text_content': '',
+            'attributes': attributes,
+            'full_text': '',
+            'parent_path': parent_path
+        }
+        self.content_index[element_id] = index_item
+        return index_item
 
-        # 构建索引
-        self.content_index = {}
-        self._traverse_and_index(soup)
+    def _traverse_and_index(self, element, depth: int, parent_path: str,
+                            container: Optional[str], preserve_whitespace: bool) -> Tuple[str, str]:
+        """
+        递归遍历并建立索引
 
-        # 简化HTML结构
-        from .html_simplifier import HTMLSimplifier
-        simplifier = HTMLSimplifier()
-        simplified_html = simplifier.simplify_html_string(html_content)
-        stats = simplifier.get_simplification_stats()
+        元素的文本由子元素的文本拼接而成，每个元素只遍历一次；脚本、样式等容器标签内的文本
+        只计入容器标签自身（与BeautifulSoup的get_text一致）
 
-        return {
-            'search_index': self.content_index,
-            'simplified_html': simplified_html,
-            'simplification_stats': stats
-        }
+        Args:
+            element: lxml元素
+            depth: 元素深度
+            parent_path: 父元素路径
+            container: 所在的最内层容器标签名（不在容器内时为None）
+            preserve_whitespace: 是否在保留空白的标签（pre、textarea）内
 
-    def _traverse_and_index(self, element, depth: int = 0, parent_path: str = ""):
-        """递归遍历并建立索引"""
-        if hasattr(element, 'name') and element.name:
-            # 生成元素路径
-            element_id = f"element_{len(self.content_index)}"
-            current_path = f"{parent_path}/{element.name}" if parent_path else element.name
-
-            # 提取元素信息
-            text_content = element.get_text(strip=True)
-            attributes = dict(element.attrs)
-
-            # 建立索引项
-            index_item = {
-                'element_id': element_id,
-                'tag': element.name,
-                'path': current_path,
-                'depth': depth,
-                'text_content': text_content,
-                'attributes': attributes,
-                'full_text': element.get_text(),
-                'parent_path': parent_path
-            }
-
-            # 添加到索引
-            self.content_index[element_id] = index_item
-
-            # 递归处理子元素
-            if hasattr(element, 'children'):
-                for child in element.children:
-                    if hasattr(child, 'name') and child.name:
-                        self._traverse_and_index(child, depth + 1, current_path)
+        Returns:
+            (完整文本, 去除空白的文本)，只包含与本元素同属一个容器的文本
+        """
+        # 标签名只有少数几种，驻留后所有索引项共享
+        tag = sys.intern(element.tag)
+        if tag in _STRING_CONTAINER_TAGS:
+            container = tag
+
+        attributes = _element_attributes(tag, element.attrib)
+        classes = attributes.get('class')
+        if classes:
+            classes[:] = [_intern_class(name) for name in classes]
+
+        index_item = self._new_index_item(tag, attributes, depth, parent_path)
+        current_path = index_item['path']
+
+        # 元素自身的文本所在位置是否保留空白（子元素之后的文本在父元素中，不受子元素影响）
+        preserve_inner = preserve_whitespace or tag in _PRESERVE_WHITESPACE_TAGS
+
+        text = element.text
+        full_parts = [text if preserve_inner else _collapse_whitespace(text)] if text else []
+        stripped_parts = [text.strip()] if text else []
+
+        for child in element:
+            # 注释和处理指令只保留其后的文本
+            if isinstance(child.tag, str):
+                child_full, child_stripped = self._traverse_and_index(child, depth + 1, current_path,
+                                                                      container, preserve_inner)
+                child_container = child.tag if child.tag in _STRING_CONTAINER_TAGS else container
+                if child_container == container:
+                    full_parts.append(child_full)
+                    stripped_parts.append(child_stripped)
+            tail = child.tail
+            if tail:
+                full_parts.append(tail if preserve_inner else _collapse_whitespace(tail))
+                stripped_parts.append(tail.strip())
+
+        full_text = ''.join(full_parts)
+        text_content = ''.join(stripped_parts)
+
+        # 容器内的普通标签没有可计入的文本
+        if container is None or container == tag:
+            index_item['full_text'] = full_text
+            index_item['text_content'] = text_content
+
+        return full_text, text_content
 
     def search_by_keyword(self, keyword: str, search_type: str = 'all') -> List[Dict[str, Any]]:
         """
@@ -91,43 +344,224 @@ class HTMLContentSearch:
             搜索结果列表
         """
         results = []
-        keyword_lower = keyword.lower()
+        for item, match_score, match_reasons, _ in self.find_keyword_matches([keyword], search_type):
+            result_item = copy_index_item(item)
+            result_item['match_score'] = match_score
+            result_item['match_reasons'] = list(match_reasons)
+            results.append(result_item)
+        return results
 
-        for element_id, item in self.content_index.items():
-            match_score = 0
-            match_reasons = []
+    def search_by_keywords(self, keywords: List[str], search_type: str = 'all') -> List[Dict[str, Any]]:
+        """
+        一次遍历索引搜索多个关键字
 
-            # 搜索标签名
-            if search_type in ['all', 'tag']:
-                if keyword_lower in item['tag'].lower():
+        每个元素的字段只转换一次小写。结果按关键字顺序排列、同一关键字内按匹配分数排序，
+        与依次调用search_by_keyword后拼接的结果一致
+
+        Args:
+            keywords: 搜索关键字列表
+            search_type: 搜索类型 ('all', 'tag', 'text', 'attribute')
+
+        Returns:
+            搜索结果列表（每项附带matched_keyword字段）
+        """
+        results = []
+        for item, match_score, match_reasons, keyword in self.find_keyword_matches(keywords, search_type):
+            result_item = copy_index_item(item)
+            result_item['match_score'] = match_score
+            result_item['match_reasons'] = list(match_reasons)
+            result_item['matched_keyword'] = keyword
+            results.append(result_item)
+        return results
+
+    def find_keyword_matches(self, keywords: List[str],
+                             search_type: str = 'all') -> List[Tuple[Dict[str, Any], int, Tuple[str, ...], str]]:
+        """
+        一次遍历索引匹配多个关键字，不复制索引项
+
+        Args:
+            keywords: 搜索关键字列表
+            search_type: 搜索类型 ('all', 'tag', 'text', 'attribute')
+
+        Returns:
+            (索引项, 匹配分数, 匹配原因, 关键字) 列表，顺序与search_by_keywords一致
+        """
+        keyword_pairs = [(keyword, keyword.lower()) for keyword in keywords]
+        buckets = [[] for _ in keyword_pairs]
+        if not keyword_pairs:
+            return []
+
+        # 合并正则只做预筛选：字段中不含任何关键字时跳过逐个关键字的比较，
+        # 命中后仍用子串判断，保证重叠关键字的计分与逐个搜索一致
+        keywords_lower = tuple(keyword_lower for _, keyword_lower in keyword_pairs)
+        any_keyword = _compiled_keywords(keywords_lower).search
+
+        search_tag = search_type in ['all', 'tag']
+        search_text = search_type in ['all', 'text']
+        search_attribute = search_type in ['all', 'attribute']
+
+        rows = self._keyword_rows()
+        if any(not keyword_lower.strip() or _FIELD_SEPARATOR in keyword_lower for keyword_lower in keywords_lower):
+            # 空白关键字几乎匹配所有字段，含分隔符的关键字可能跨字段匹配，这两种情况直接逐行比较
+            candidates = range(len(rows))
+        else:
+            candidates = self._keyword_candidates(any_keyword, search_tag, search_text, search_attribute)
+
+        for row_index in candidates:
+            item, tag_lower, text_lower, attr_pairs = rows[row_index]
+            if not search_tag or not any_keyword(tag_lower):
+                tag_lower = None
+
+            if not search_text or text_lower is None or not any_keyword(text_lower):
+                text_lower = None
+
+            attr_values = []
+            if search_attribute:
+                attr_values = [pair for pair in attr_pairs if any_keyword(pair[1])]
+
+            if tag_lower is None and text_lower is None and not attr_values:
+                continue
+
+            for bucket, (keyword, keyword_lower) in zip(buckets, keyword_pairs):
+                match_score = 0
+                match_reasons = []
+
+                if tag_lower is not None and keyword_lower in tag_lower:
                     match_score += 10
                     match_reasons.append('tag_match')
 
-            # 搜索文本内容
-            if search_type in ['all', 'text']:
-                if item['text_content'] and keyword_lower in item['text_content'].lower():
+                if text_lower is not None and keyword_lower in text_lower:
                     match_score += 5
                     match_reasons.append('text_match')
 
-            # 搜索属性值
-            if search_type in ['all', 'attribute']:
+                for attr_name, attr_value_lower in attr_values:
+                    if keyword_lower in attr_value_lower:
+                        match_score += 3
+                        match_reasons.append(f'attr_match_{attr_name}')
+
+                if match_score > 0:
+                    bucket.append((item, match_score, tuple(match_reasons), keyword))
+
+        matches = []
+        for bucket in buckets:
+            bucket.sort(key=lambda x: x[1], reverse=True)
+            matches.extend(bucket)
+        return matches
+
+    def _keyword_candidates(self, any_keyword: Callable, search_tag: bool, search_text: bool,
+                            search_attribute: bool) -> List[int]:
+        """
+        找出可能匹配关键字的行（按文档顺序）
+
+        标签名按不同取值各判断一次；文本和属性值拼接后由正则在一次扫描中找出含有关键字的字段，
+        只有这些行需要逐个关键字计分
+
+        Args:
+            any_keyword: 合并关键字正则的search方法
+            search_tag: 是否搜索标签名
+            search_text: 是否搜索文本
+            search_attribute: 是否搜索属性
+
+        Returns:
+            候选行号列表
+        """
+        tag_rows, text_field, attr_field = self._keyword_fields()
+        hits = set()
+
+        if search_tag:
+            for tag_lower, row_ids in tag_rows.items():
+                if any_keyword(tag_lower):
+                    hits.update(row_ids)
+        if search_text:
+            _field_hits(any_keyword, text_field, hits)
+        if search_attribute:
+            _field_hits(any_keyword, attr_field, hits)
+
+        return sorted(hits)
+
+    def _keyword_fields(self) -> Tuple[Dict[str, List[int]], Tuple[str, List[int], List[int]],
+                                       Tuple[str, List[int], List[int]]]:
+        """
+        关键字候选查找用的字段表
+
+        每个索引只生成一次并随索引一起缓存
+
+        Returns:
+            ({小写标签名: 行号列表}, 文本字段, 属性值字段)，
+            字段为(用分隔符拼接的小写值, 各值的起始位置, 各值所属的行号)
+        """
+        fields = self._search_data.get('_keyword_fields')
+        if fields is None:
+            tag_rows = {}
+            texts, text_starts, text_rows = [], [], []
+            attr_values, attr_starts, attr_rows = [], [], []
+            text_pos = attr_pos = 0
+            for row_index, (_, tag_lower, text_lower, attr_pairs) in enumerate(self._keyword_rows()):
+                tag_rows.setdefault(tag_lower, []).append(row_index)
+                if text_lower is not None:
+                    texts.append(text_lower)
+                    text_starts.append(text_pos)
+                    text_rows.append(row_index)
+                    text_pos += len(text_lower) + 1
+                for _, attr_value_lower in attr_pairs:
+                    attr_values.append(attr_value_lower)
+                    attr_starts.append(attr_pos)
+                    attr_rows.append(row_index)
+                    attr_pos += len(attr_value_lower) + 1
+            fields = (tag_rows,
+                      (_FIELD_SEPARATOR.join(texts), text_starts, text_rows),
+                      (_FIELD_SEPARATOR.join(attr_values), attr_starts, attr_rows))
+            self._search_data['_keyword_fields'] = fields
+        return fields
+
+    def _keyword_rows(self) -> List[Tuple[Dict[str, Any], str, Optional[str], Tuple[Tuple[str, str], ...]]]:
+        """
+        关键字匹配用的小写字段表
+
+        每个索引只生成一次并随索引一起缓存，之后的关键字查询不再逐项转换小写
+
+        Returns:
+            (索引项, 小写标签名, 小写文本或None, ((属性名, 小写属性值), ...)) 列表
+        """
+        rows = self._search_data.get('_keyword_rows')
+        if rows is None:
+            rows = []
+            for item in self.content_index.values():
+                attr_pairs = []
                 for attr_name, attr_value in item['attributes'].items():
                     if isinstance(attr_value, list):
                         attr_value = ' '.join(attr_value)
-                    if keyword_lower in str(attr_value).lower():
-                        match_score += 3
-                        match_reasons.append(f'attr_match_{attr_name}')
+                    attr_pairs.append((attr_name, str(attr_value).lower()))
+                text_content = item['text_content']
+                rows.append((item, item['tag'].lower(), text_content.lower() if text_content else None,
+                             tuple(attr_pairs)))
+            self._search_data['_keyword_rows'] = rows
+        return rows
+
+    def _selector_index(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        选择器用的倒排索引
 
-            # 如果有匹配，添加到结果
-            if match_score > 0:
-                result_item = item.copy()
-                result_item['match_score'] = match_score
-                result_item['match_reasons'] = match_reasons
-                results.append(result_item)
+        每个索引只生成一次并随索引一起缓存，索引项按文档顺序排列
 
-        # 按匹配分数排序
-        results.sort(key=lambda x: x['match_score'], reverse=True)
-        return results
+        Returns:
+            {'id': {id值: 索引项列表}, 'class': {class名: 索引项列表}, 'tag': {标签名: 索引项列表}}
+        """
+        selector_index = self._search_data.get('_selector_index')
+        if selector_index is None:
+            by_id, by_class, by_tag = {}, {}, {}
+            for item in self.content_index.values():
+                attributes = item['attributes']
+                element_id = attributes.get('id')
+                if element_id is not None:
+                    by_id.setdefault(element_id, []).append(item)
+                # 同一元素重复的class名只记录一次
+                for class_name in dict.fromkeys(attributes.get('class', ())):
+                    by_class.setdefault(class_name, []).append(item)
+                by_tag.setdefault(item['tag'], []).append(item)
+            selector_index = {'id': by_id, 'class': by_class, 'tag': by_tag}
+            self._search_data['_selector_index'] = selector_index
+        return selector_index
 
     def search_by_selector(self, selector: str, selector_type: str = 'css') -> List[Dict[str, Any]]:
         """
@@ -140,11 +574,54 @@ class HTMLContentSearch:
         Returns:
             匹配的元素列表
         """
-        results = []
+        if selector_type == 'css':
+            compiled = _compiled_css(selector)
+        elif selector_type == 'xpath':
+            compiled = _compiled_xpath(selector)
+        else:
+            return []
 
-        for element_id, item in self.content_index.items():
-            if self._matches_selector(item, selector, selector_type):
-                results.append(item)
+        if compiled[0] in _INDEXED_SELECTOR_KINDS:
+            # id、class和标签选择器直接查倒排索引
+            return list(map(copy_index_item, self._selector_index()[compiled[0]].get(compiled[1], ())))
+
+        return list(map(copy_index_item, filter(_compiled_predicate(compiled), self.content_index.values())))
+
+    def search_by_selectors(self, selectors: List[str], selector_type: str = 'css') -> Dict[str, List[Dict[str, Any]]]:
+        """
+        一次遍历索引匹配多个选择器
+
+        Args:
+            selectors: CSS选择器或XPath表达式列表
+            selector_type: 选择器类型 ('css' 或 'xpath')
+
+        Returns:
+            以选择器为键的匹配元素列表字典
+        """
+        if selector_type == 'css':
+            compile_selector = _compiled_css
+        elif selector_type == 'xpath':
+            compile_selector = _compiled_xpath
+        else:
+            return {selector: [] for selector in selectors}
+
+        results = {selector: [] for selector in selectors}
+        predicates = []
+        for selector in results:
+            compiled = compile_selector(selector)
+            if compiled[0] in _INDEXED_SELECTOR_KINDS:
+                # id、class和标签选择器直接查倒排索引，不参与逐项遍历
+                results[selector].extend(map(copy_index_item, self._selector_index()[compiled[0]].get(compiled[1], ())))
+            else:
+                predicates.append((_compiled_predicate(compiled), results[selector].append))
+
+        if not predicates:
+            return results
+
+        for item in self.content_index.values():
+            for matches, append in predicates:
+                if matches(item):
+                    append(copy_index_item(item))
 
         return results
 
@@ -159,46 +636,16 @@ class HTMLContentSearch:
     def _matches_css_selector(self, item: Dict[str, Any], selector: str) -> bool:
         """检查元素是否匹配CSS选择器"""
         # 简化版本的CSS选择器匹配
-        if selector.startswith('#'):
-            # ID选择器
-            element_id = selector[1:]
-            return item['attributes'].get('id') == element_id
-        elif selector.startswith('.'):
-            # 类选择器
-            class_name = selector[1:]
-            classes = item['attributes'].get('class', [])
-            return class_name in classes
-        elif selector.startswith('[') and selector.endswith(']'):
-            # 属性选择器
-            attr_match = re.search(r'\[([^=]+)=([^\]]+)\]', selector)
-            if attr_match:
-                attr_name = attr_match.group(1)
-                attr_value = attr_match.group(2).strip('"\'')
-                return item['attributes'].get(attr_name) == attr_value
-        else:
-            # 标签选择器
-            return item['tag'] == selector
-
-        return False
+        return self._matches_compiled(item, _compiled_css(selector))
 
     def _matches_xpath_selector(self, item: Dict[str, Any], selector: str) -> bool:
         """检查元素是否匹配XPath选择器"""
         # 简化版本的XPath匹配
-        if '[@id=' in selector:
-            id_match = re.search(r"@id='([^']*)'", selector)
-            if id_match:
-                element_id = id_match.group(1)
-                return item['attributes'].get('id') == element_id
-        elif '[@class=' in selector:
-            class_match = re.search(r"@class='([^']*)'", selector)
-            if class_match:
-                class_name = class_match.group(1)
-                classes = item['attributes'].get('class', [])
-                return class_name in classes
-        elif item['tag'] in selector:
-            return True
+        return self._matches_compiled(item, _compiled_xpath(selector))
 
-        return False
+    def _matches_compiled(self, item: Dict[str, Any], compiled: Tuple[str, ...]) -> bool:
+        """按解析后的选择器检查元素是否匹配"""
+        return _compiled_predicate(compiled)(item)
 
     def get_element_by_id(self, element_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -210,7 +657,8 @@ class HTMLContentSearch:
         Returns:
             元素信息或None
         """
-        return self.content_index.get(element_id)
+        item = self.content_index.get(element_id)
+        return copy_index_item(item) if item is not None else None
 
     def get_elements_by_path(self, path_pattern: str) -> List[Dict[str, Any]]:
         """
@@ -225,7 +673,7 @@ class HTMLContentSearch:
         results = []
         for element_id, item in self.content_index.items():
             if path_pattern in item['path']:
-                results.append(item)
+                results.append(copy_index_item(item))
 
         return results
 
@@ -236,19 +684,16 @@ class HTMLContentSearch:
         Returns:
             统计信息
         """
-        total_elements = len(self.content_index)
-        tag_counts = {}
-        depth_counts = {}
-
-        for item in self.content_index.values():
-            tag = item['tag']
-            depth = item['depth']
-
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-            depth_counts[depth] = depth_counts.get(depth, 0) + 1
+        # 分布随索引一起缓存，重复获取统计信息时不再遍历索引
+        distributions = self._search_data.get('_distributions')
+        if distributions is None:
+            items = self.content_index.values()
+            distributions = (Counter(map(itemgetter('tag'), items)), Counter(map(itemgetter('depth'), items)))
+            self._search_data['_distributions'] = distributions
+        tag_counts, depth_counts = distributions
 
         return {
-            'total_elements': total_elements,
-            'tag_distribution': tag_counts,
-            'depth_distribution': depth_counts
+            'total_elements': len(self.content_index),
+            'tag_distribution': dict(tag_counts),
+            'depth_distribution': dict(depth_counts)
         }
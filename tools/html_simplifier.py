@@ -5,12 +5,26 @@ HTML简化工具类
 移除实际内容但保留标签结构、属性和层次关系。
 """
 
-from typing import Dict, List, Optional, Any
-from bs4 import BeautifulSoup, Tag
+from typing import Dict, List, Optional, Any, Tuple
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from bs4.element import PreformattedString
 import re
 from pathlib import Path
 
 
+# 需要整体移除的标签及其对应的统计项
+_REMOVED_TAG_STATS = {
+    'script': 'script_tags',
+    'style': 'style_tags',
+    'img': 'img_tags'
+}
+
+# 替换文本节点的占位符（超过长度阈值的文本用长文本占位符）
+_TEXT_PLACEHOLDER = '[TEXT]'
+_LONG_TEXT_PLACEHOLDER = '[TEXT_CONTENT]'
+_LONG_TEXT_THRESHOLD = 50
+
+
 class HTMLSimplifier:
     """HTML简化工具类"""
 
@@ -46,6 +60,18 @@ class HTMLSimplifier:
         Args:
             html_content: HTML内容字符串
 
+        Returns:
+            简化后的HTML字符串
+        """
+        return self.simplify_soup(BeautifulSoup(html_content, 'lxml'))
+
+    def simplify_soup(self, soup: BeautifulSoup) -> str:
+        """
+        简化已解析的HTML树，调用方已有解析树时省去重复解析
+
+        Args:
+            soup: 解析树（会被直接修改，需要保留原树时传入副本）
+
         Returns:
             简化后的HTML字符串
         """
@@ -58,66 +84,79 @@ class HTMLSimplifier:
             'comments': 0
         }
 
-        # 解析HTML
-        soup = BeautifulSoup(html_content, 'lxml')
+        # 一次遍历对节点分类，各简化步骤只处理各自的节点
+        removed_tags, comments, text_nodes, kept_tags = self._classify_nodes(soup)
 
         # 简化处理
-        self._remove_content(soup)
-        self._clean_attributes(soup)
+        self._remove_content(removed_tags, comments, text_nodes)
+        self._clean_attributes(kept_tags)
         self._normalize_structure(soup)
 
         return str(soup)
 
-    def _remove_content(self, soup: BeautifulSoup) -> None:
-        """移除内容，保留结构"""
+    def _classify_nodes(self, soup: BeautifulSoup) -> Tuple[List[Tag], List[Comment],
+                                                            List[Tuple[NavigableString, str]], List[Tag]]:
+        """
+        一次遍历解析树，把节点分为待处理的几类
 
-        # 移除script标签
-        for script in soup.find_all('script'):
-            self.removed_content_stats['script_tags'] += 1
-            script.decompose()
+        Args:
+            soup: 解析树
 
-        # 移除style标签
-        for style in soup.find_all('style'):
-            self.removed_content_stats['style_tags'] += 1
-            style.decompose()
+        Returns:
+            (要移除的script/style/img标签, 注释, (非空文本节点, 占位符)列表, 保留的标签)，
+            要移除的标签内部的节点不计入其他类别；文档类型声明、处理指令等原样保留
+        """
+        removed_tags, comments, text_nodes, kept_tags = [], [], [], []
+        removed_ids = set()
+
+        for node in soup.descendants:
+            if id(node.parent) in removed_ids:
+                # 随所在的标签一起移除
+                removed_ids.add(id(node))
+            elif isinstance(node, Tag):
+                if node.name in _REMOVED_TAG_STATS:
+                    removed_tags.append(node)
+                    removed_ids.add(id(node))
+                else:
+                    kept_tags.append(node)
+            elif isinstance(node, Comment):
+                comments.append(node)
+            elif isinstance(node, PreformattedString):
+                # 文档类型声明、CDATA、处理指令等不是文本内容，保留原样
+                continue
+            else:
+                stripped = node.strip()
+                if stripped:
+                    text_nodes.append((node, _LONG_TEXT_PLACEHOLDER if len(stripped) > _LONG_TEXT_THRESHOLD
+                                       else _TEXT_PLACEHOLDER))
+
+        return removed_tags, comments, text_nodes, kept_tags
+
+    def _remove_content(self, removed_tags: List[Tag], comments: List[Comment],
+                        text_nodes: List[Tuple[NavigableString, str]]) -> None:
+        """移除内容，保留结构"""
 
-        # 移除img标签
-        for img in soup.find_all('img'):
-            self.removed_content_stats['img_tags'] += 1
-            img.decompose()
+        # 移除script、style和img标签
+        for tag in removed_tags:
+            self.removed_content_stats[_REMOVED_TAG_STATS[tag.name]] += 1
+            tag.decompose()
 
         # 移除注释
-        for comment in soup.find_all(string=lambda string: isinstance(string, type(soup.parser.make_comment("")) if soup.parser else str)):
+        for comment in comments:
             self.removed_content_stats['comments'] += 1
             comment.extract()
 
         # 清理文本内容
-        self._clean_text_content(soup)
-
-    def _clean_text_content(self, element) -> None:
-        """递归清理文本内容"""
-        if hasattr(element, 'children'):
-            for child in list(element.children):
-                if isinstance(child, Tag):
-                    # 递归处理子标签
-                    self._clean_text_content(child)
-                elif hasattr(child, 'strip') and child.strip():
-                    # 处理文本节点
-                    self.removed_content_stats['text_nodes'] += 1
-                    # 保留结构标记，但移除具体内容
-                    if len(child.strip()) > 50:  # 长文本用简短占位符
-                        child.replace_with('[TEXT_CONTENT]')
-                    else:
-                        child.replace_with('[TEXT]')
-                elif str(child).strip():
-                    # 处理其他类型的文本节点
-                    self.removed_content_stats['text_nodes'] += 1
-                    if len(str(child).strip()) > 50:
-                        child.replace_with('[TEXT_CONTENT]')
-                    else:
-                        child.replace_with('[TEXT]')
-
-    def _clean_attributes(self, soup: BeautifulSoup) -> None:
+        self._clean_text_content(text_nodes)
+
+    def _clean_text_content(self, text_nodes: List[Tuple[NavigableString, str]]) -> None:
+        """清理文本内容，把非空文本节点逐个替换为分类时选定的占位符"""
+        # 保留结构标记，但移除具体内容
+        self.removed_content_stats['text_nodes'] += len(text_nodes)
+        for node, placeholder in text_nodes:
+            node.replace_with(placeholder)
+
+    def _clean_attributes(self, tags: List[Tag]) -> None:
         """清理和简化属性"""
 
         # 需要保留的重要属性
@@ -126,32 +165,31 @@ class HTMLSimplifier:
             'href', 'src', 'alt', 'title', 'data-*'
         }
 
-        for tag in soup.find_all():
-            if isinstance(tag, Tag):
-                attrs_to_remove = []
-                for attr, value in tag.attrs.items():
-                    should_keep = False
-
-                    # 检查是否是重要属性
-                    if attr in important_attrs:
-                        should_keep = True
-                    elif attr.startswith('data-'):
-                        should_keep = True
-                    elif attr in ['style', 'onclick', 'onload']:
-                        # 移除样式和事件属性
-                        pass
-                    elif len(str(value)) > 200:
-                        # 移除过长的属性值
-                        pass
-                    else:
-                        should_keep = True
-
-                    if not should_keep:
-                        attrs_to_remove.append(attr)
-
-                # 移除不需要的属性
-                for attr in attrs_to_remove:
-                    del tag.attrs[attr]
+        for tag in tags:
+            attrs_to_remove = []
+            for attr, value in tag.attrs.items():
+                should_keep = False
+
+                # 检查是否是重要属性
+                if attr in important_attrs:
+                    should_keep = True
+                elif attr.startswith('data-'):
+                    should_keep = True
+                elif attr in ['style', 'onclick', 'onload']:
+                    # 移除样式和事件属性
+                    pass
+                elif len(str(value)) > 200:
+                    # 移除过长的属性值
+                    pass
+                else:
+                    should_keep = True
+
+                if not should_keep:
+                    attrs_to_remove.append(attr)
+
+            # 移除不需要的属性
+            for attr in attrs_to_remove:
+                del tag.attrs[attr]
 
     def _normalize_structure(self, soup: BeautifulSoup) -> None:
         """标准化HTML结构"""
@@ -170,6 +208,19 @@ class HTMLSimplifier:
             if soup.html:
                 soup.html.append(body_tag)
 
+    def simplify_html_with_stats(self, html_content: str) -> Tuple[str, Dict[str, int]]:
+        """
+        简化HTML字符串并同时返回本次简化的统计信息
+
+        Args:
+            html_content: HTML内容字符串
+
+        Returns:
+            (简化后的HTML字符串, 统计信息字典)
+        """
+        simplified_html = self.simplify_html_string(html_content)
+        return simplified_html, self.removed_content_stats.copy()
+
     def get_simplification_stats(self) -> Dict[str, int]:
         """
         获取简化统计信息
@@ -179,17 +230,19 @@ class HTMLSimplifier:
         """
         return self.removed_content_stats.copy()
 
-    def extract_structure_tree(self, html_content: str) -> Dict[str, Any]:
+    def extract_structure_tree(self, html_content: str, soup: Optional[BeautifulSoup] = None) -> Dict[str, Any]:
         """
         提取HTML结构树
 
         Args:
             html_content: HTML内容
+            soup: 已解析的解析树（可选，传入时直接使用，不再重新解析；只读不修改）
 
         Returns:
             结构树字典
         """
-        soup = BeautifulSoup(html_content, 'lxml')
+        if soup is None:
+            soup = BeautifulSoup(html_content, 'lxml')
         return self._build_structure_tree(soup)
 
     def _build_structure_tree(self, element, depth: int = 0) -> Dict[str, Any]:
@@ -4,16 +4,28 @@
 基于HTML简化技术，存储标签结构和内容映射
 """
 
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from collections import Counter, OrderedDict
 import json
 import pickle
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
+
 
 class StructuredDataStore:
     """结构化数据存储器"""
 
+    # 缓存的内容搜索结果数量（文档集合变化时整体失效）
+    SEARCH_CACHE_SIZE = 256
+
+    # 内存中保留的文档数量，超出时淘汰最久未使用的文档（文件仍保留，需要时重新加载）
+    STRUCTURE_CACHE_SIZE = 128
+
     def __init__(self, storage_path: str = "data_store"):
         """
         初始化数据存储器
@@ -24,10 +36,17 @@ class StructuredDataStore:
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(exist_ok=True)
 
-        # 内存中的数据缓存
-        self.structures = {}  # 存储简化结构
-        self.content_maps = {}  # 存储内容映射
+        # 内存中的数据缓存（按最近使用排序）
+        self.structures = OrderedDict()  # 存储简化结构
+        self.content_maps = OrderedDict()  # 存储内容映射
         self.metadata = {}  # 存储元数据
+        self.source_docs = {}  # 数据源ID -> 文档ID（数据源ID基于内容摘要时，相同内容只存储一次）
+
+        # 本次存储或加载过的所有文档ID（按加入顺序，包括已从内存淘汰的文档）
+        self._doc_ids = {}
+
+        # (小写关键字, 搜索类型) -> 搜索结果；只对当前的文档集合有效
+        self._search_cache = OrderedDict()
 
     def store_html_data(self, source_id: str, html_data: Dict[str, Any]) -> str:
         """
@@ -38,8 +57,12 @@ class StructuredDataStore:
             html_data: HTML数据（包含简化结构和内容映射）
 
         Returns:
-            存储的文档ID
+            存储的文档ID（同一数据源已存储过时返回已有的文档ID）
         """
+        existing_doc_id = self.source_docs.get(source_id)
+        if existing_doc_id is not None and existing_doc_id in self._doc_ids:
+            return existing_doc_id
+
         doc_id = f"{source_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
         # 提取数据
@@ -60,18 +83,45 @@ class StructuredDataStore:
         }
 
         # 存储到内存
-        self.structures[doc_id] = structure_data
-        self.content_maps[doc_id] = content_mapping
+        self._cache_structure(doc_id, structure_data)
+        self.source_docs[source_id] = doc_id
 
         # 存储到文件
         self._save_to_file(doc_id, structure_data)
 
         return doc_id
 
+    def _cache_structure(self, doc_id: str, structure_data: Dict[str, Any]) -> None:
+        """把文档放入内存缓存，超出数量时淘汰最久未使用的文档"""
+        self.structures[doc_id] = structure_data
+        self.content_maps[doc_id] = structure_data.get('content_mapping', {})
+
+        if doc_id not in self._doc_ids:
+            self._doc_ids[doc_id] = None
+            self._search_cache.clear()
+
+        while len(self.structures) > self.STRUCTURE_CACHE_SIZE:
+            evicted_doc_id, _ = self.structures.popitem(last=False)
+            self.content_maps.pop(evicted_doc_id, None)
+
     def _save_to_file(self, doc_id: str, data: Dict[str, Any]):
         """保存数据到文件"""
         file_path = self.storage_path / f"{doc_id}.json"
 
+        if orjson is not None:
+            # orjson直接序列化原生类型，无法序列化的对象由default转换为字符串，省去预先遍历；
+            # 日期时间和dataclass同样交给default，与标准库json的写法保持一致
+            try:
+                serialized = orjson.dumps(data, default=self._make_serializable,
+                                          option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                                          | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+            except orjson.JSONEncodeError:
+                serialized = None
+            if serialized is not None:
+                with open(file_path, 'wb') as f:
+                    f.write(serialized)
+                return
+
         # 转换为可序列化的格式
         serializable_data = self._make_serializable(data)
 
@@ -79,10 +129,10 @@ class StructuredDataStore:
             json.dump(serializable_data, f, ensure_ascii=False, indent=2)
 
     def _make_serializable(self, obj: Any) -> Any:
-        """将对象转换为可序列化的格式"""
+        """将对象转换为可序列化的格式（元组与列表一样写为数组，与orjson一致）"""
         if isinstance(obj, dict):
             return {key: self._make_serializable(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
+        elif isinstance(obj, (list, tuple)):
             return [self._make_serializable(item) for item in obj]
         elif isinstance(obj, (int, float, str, bool, type(None))):
             return obj
@@ -100,19 +150,33 @@ class StructuredDataStore:
             HTML数据或None
         """
         # 首先尝试从内存加载
-        if doc_id in self.structures:
-            return self.structures[doc_id]
+        data = self.structures.get(doc_id)
+        if data is not None:
+            self.structures.move_to_end(doc_id)
+            return data
 
-        # 从文件加载
+        # 从文件加载（包括已从内存淘汰的文档）
         file_path = self.storage_path / f"{doc_id}.json"
         if file_path.exists():
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.structures[doc_id] = data
-                return data
+            data = self._load_from_file(file_path)
+            self._cache_structure(doc_id, data)
+            return data
 
         return None
 
+    def _load_from_file(self, file_path: Path) -> Dict[str, Any]:
+        """从文件读取数据"""
+        raw = file_path.read_bytes()
+
+        if orjson is not None:
+            # orjson直接解析字节，省去解码为字符串的开销；标准库json写入的NaN等非标准值解析失败时退回json
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass
+
+        return json.loads(raw.decode('utf-8'))
+
     def search_content(self, keyword: str, search_type: str = 'all') -> List[Dict[str, Any]]:
         """
         在所有存储的数据中搜索内容
@@ -124,36 +188,71 @@ class StructuredDataStore:
         Returns:
             搜索结果
         """
-        results = []
+        keyword_lower = keyword.lower()
+
+        # 文档集合未变化时直接复用之前的搜索结果
+        cache_key = (keyword_lower, search_type)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            self._search_cache.move_to_end(cache_key)
+            return list(cached)
 
-        for doc_id, structure_data in self.structures.items():
+        results = []
+        for doc_id, structure_data in self._iter_documents():
             content_mapping = structure_data.get('content_mapping', {})
 
             for tag_id, info in content_mapping.items():
-                if self._matches_search(keyword, info, search_type):
+                match_type = self._match_search(keyword_lower, info, search_type)
+                if match_type is not None:
                     results.append({
                         'doc_id': doc_id,
                         'tag_id': tag_id,
                         'info': info,
-                        'match_type': self._get_match_type(keyword, info)
+                        'match_type': match_type
                     })
 
-        return results
+        self._search_cache[cache_key] = results
+        if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return list(results)
 
-    def _matches_search(self, keyword: str, info: Dict[str, Any], search_type: str) -> bool:
-        """检查是否匹配搜索条件"""
-        keyword_lower = keyword.lower()
+    def _iter_documents(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        依次取出所有文档
+
+        已从内存淘汰的文档直接从文件读取，不放回内存缓存，也不调整缓存中文档的使用顺序，
+        遍历全部文档时不会把常用文档挤出缓存
+        """
+        for doc_id in list(self._doc_ids):
+            structure_data = self.structures.get(doc_id)
+            if structure_data is None:
+                file_path = self.storage_path / f"{doc_id}.json"
+                if not file_path.exists():
+                    continue
+                structure_data = self._load_from_file(file_path)
+            yield doc_id, structure_data
+
+    def _match_search(self, keyword_lower: str, info: Dict[str, Any], search_type: str) -> Optional[str]:
+        """
+        检查是否匹配搜索条件，每个字段只比较一次
+
+        Args:
+            keyword_lower: 小写的搜索关键字
+            info: 元素信息
+            search_type: 搜索类型
 
-        # 搜索标签名
-        if search_type in ['all', 'tag']:
-            if keyword_lower in info.get('tag', '').lower():
-                return True
+        Returns:
+            匹配类型（'tag'、'text'或'attribute'，按标签、文本、属性的顺序取第一个命中的字段，
+            不受搜索类型限制），不匹配时返回None
+        """
+        tag_match = keyword_lower in info.get('tag', '').lower()
+        text_content = info.get('text_content', '')
+        text_match = bool(text_content) and keyword_lower in text_content.lower()
 
-        # 搜索文本内容
-        if search_type in ['all', 'text']:
-            text_content = info.get('text_content', '')
-            if text_content and keyword_lower in text_content.lower():
-                return True
+        if tag_match and search_type in ['all', 'tag']:
+            return 'tag'
+        if text_match and search_type in ['all', 'text']:
+            return 'tag' if tag_match else 'text'
 
         # 搜索属性
         if search_type in ['all', 'attribute']:
@@ -162,20 +261,9 @@ class StructuredDataStore:
                 if isinstance(attr_value, list):
                     attr_value = ' '.join(attr_value)
                 if keyword_lower in str(attr_value).lower():
-                    return True
+                    return 'tag' if tag_match else 'text' if text_match else 'attribute'
 
-        return False
-
-    def _get_match_type(self, keyword: str, info: Dict[str, Any]) -> str:
-        """获取匹配类型"""
-        keyword_lower = keyword.lower()
-
-        if keyword_lower in info.get('tag', '').lower():
-            return 'tag'
-        elif info.get('text_content', '') and keyword_lower in info.get('text_content', '').lower():
-            return 'text'
-        else:
-            return 'attribute'
+        return None
 
     def get_element_info(self, doc_id: str, tag_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -218,7 +306,7 @@ class StructuredDataStore:
         Returns:
             文档ID列表
         """
-        return list(self.structures.keys())
+        return list(self._doc_ids)
 
     def delete_document(self, doc_id: str) -> bool:
         """
@@ -231,11 +319,11 @@ class StructuredDataStore:
             是否成功删除
         """
         # 从内存删除
-        if doc_id in self.structures:
-            del self.structures[doc_id]
-
-        if doc_id in self.content_maps:
-            del self.content_maps[doc_id]
+        self.structures.pop(doc_id, None)
+        self.content_maps.pop(doc_id, None)
+        if doc_id in self._doc_ids:
+            del self._doc_ids[doc_id]
+            self._search_cache.clear()
 
         # 从文件删除
         file_path = self.storage_path / f"{doc_id}.json"
@@ -252,21 +340,19 @@ class StructuredDataStore:
         Returns:
             统计信息
         """
-        total_docs = len(self.structures)
+        total_docs = 0
         total_elements = 0
-        tag_distribution = {}
+        tag_distribution = Counter()
 
-        for structure_data in self.structures.values():
+        for _, structure_data in self._iter_documents():
+            total_docs += 1
             content_mapping = structure_data.get('content_mapping', {})
             total_elements += len(content_mapping)
-
-            for info in content_mapping.values():
-                tag = info.get('tag', 'unknown')
-                tag_distribution[tag] = tag_distribution.get(tag, 0) + 1
+            tag_distribution.update(info.get('tag', 'unknown') for info in content_mapping.values())
 
         return {
             'total_documents': total_docs,
             'total_elements': total_elements,
-            'tag_distribution': tag_distribution,
+            'tag_distribution': dict(tag_distribution),
             'storage_path': str(self.storage_path)
         }